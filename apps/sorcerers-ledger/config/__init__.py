@@ -0,0 +1 @@
+# Sorcery game configuration
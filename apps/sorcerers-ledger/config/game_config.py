@@ -3,6 +3,8 @@ Sorcery: Contested Realm game configuration.
 Contains all game-specific constants and rules.
 """
 
+import re
+
 GAME_ID = "sorcery"
 GAME_NAME = "Sorcerer's Ledger"
 
@@ -21,17 +23,13 @@ SET_GROUP_IDS = {
 }
 
 # Rarity metadata
-RARITIES = ["Unique", "Elite", "Exceptional", "Ordinary"]
+RARITIES = ("Unique", "Elite", "Exceptional", "Ordinary")
 
-RARITY_NORMALIZER = {
-    "unique": "Unique",
-    "elite": "Elite",
-    "exceptional": "Exceptional",
-    "ordinary": "Ordinary",
-}
+# Values are the RARITIES strings themselves, so normalized rarities share identity
+RARITY_NORMALIZER = {rarity.lower(): rarity for rarity in RARITIES}
 
 # Rules for categorizing products based on names
-SEALED_KEYWORDS = [
+SEALED_KEYWORDS = (
     "booster box",
     "booster box case",
     "booster case",
@@ -39,12 +37,98 @@ SEALED_KEYWORDS = [
     "pledge pack",
     "display",
     "booster display",
-]
+)
+
+# Most specific (longest) keywords first, so alternation reports the most specific match
+_SEALED_KEYWORDS_BY_LEN_DESC = tuple(sorted(SEALED_KEYWORDS, key=len, reverse=True))
+
+# Set-specific sealed product patterns: set_name_lower -> patterns_in_product_name
+# (looked up by the whole lowercased set name, e.g. "Dragonlord" -> "dragonlord")
+SET_SPECIFIC_SEALED_PATTERNS = {
+    "dragonlord": ("dragonlord box",),
+}
+
+# Product classification flags returned by classify_products
+PRODUCT_FLAG_SEALED = 1          # Sealed product (booster boxes, packs, sealed precons, ...)
+PRODUCT_FLAG_PRECON_SINGLE = 2   # Single card from a preconstructed deck
+PRODUCT_FLAG_SEALED_PRECON = 4   # Sealed preconstructed product (deck box, deck)
+
+# Single-pass name matcher: every category pattern is one named alternative, so a
+# single finditer over the name yields all matched categories. Single-card markers
+# are matched case-sensitively, everything else case-insensitively. Sets with
+# set-specific sealed patterns get their own copy with those patterns appended.
+_NAME_MATCH_PLEDGE_SINGLE = 1
+_NAME_MATCH_PRECON_SINGLE = 2
+_NAME_MATCH_SEALED_PRECON = 4
+_NAME_MATCH_PRECON_DECK = 8
+_NAME_MATCH_SEALED_KEYWORD = 16
+_NAME_MATCH_SET_SEALED = 32
+
+_NAME_MATCH_BITS = {
+    "pledge_single": _NAME_MATCH_PLEDGE_SINGLE,
+    "precon_single": _NAME_MATCH_PRECON_SINGLE,
+    "sealed_precon": _NAME_MATCH_SEALED_PRECON,
+    "precon_deck": _NAME_MATCH_PRECON_DECK,
+    "sealed_keyword": _NAME_MATCH_SEALED_KEYWORD,
+    "set_sealed": _NAME_MATCH_SET_SEALED,
+}
+
+_NAME_MATCH_PATTERN = (
+    r"(?P<pledge_single>(?-i:\(Pledge Pack\)))"
+    r"|(?P<precon_single>(?-i:\(Preconstructed Deck\)))"
+    r"|(?P<sealed_precon>preconstructed deck box|preconstructed deck:)"
+    r"|(?P<precon_deck>preconstructed deck)"
+    r"|(?P<sealed_keyword>" + "|".join(re.escape(k) for k in _SEALED_KEYWORDS_BY_LEN_DESC) + r")"
+)
+_NAME_MATCH_RE = re.compile(_NAME_MATCH_PATTERN, re.IGNORECASE)
+
+
+def _match_name_categories(name: str, name_match_re=_NAME_MATCH_RE) -> int:
+    """Scan a product name once and return the _NAME_MATCH_* bits it matched."""
+    mask = 0
+    for match in name_match_re.finditer(name):
+        mask |= _NAME_MATCH_BITS[match.lastgroup]
+    return mask
+
+
+def _is_sealed_precon_mask(name: str, mask: int) -> bool:
+    """Sealed preconstructed check on an already-computed match mask."""
+    return bool(
+        mask & _NAME_MATCH_SEALED_PRECON or
+        (mask & _NAME_MATCH_PRECON_DECK and "(" not in name)
+    )
+
+
+# Names shorter than every pattern can't match anything (case-insensitive regex
+# matching is char-for-char), so classifiers can return early for them
+_MIN_PRECON_NAME_LEN = len("preconstructed deck")
+_MIN_SEALED_NAME_LEN = min(
+    [len(k) for k in SEALED_KEYWORDS] +
+    [len(p) for patterns in SET_SPECIFIC_SEALED_PATTERNS.values() for p in patterns] +
+    [_MIN_PRECON_NAME_LEN]
+)
 
-# Set-specific sealed product patterns: (set_name_lower, pattern_in_product_name)
-SET_SPECIFIC_SEALED_PATTERNS = [
-    ("dragonlord", "dragonlord box"),
-]
+
+# set_name_lower -> name matcher including that set's specific sealed patterns
+_SET_NAME_MATCH_RES = {}
+
+
+def _name_match_re_for_set(set_name: str):
+    """Return the compiled name matcher for a set (the shared one if it has no specific patterns)."""
+    set_lower = (set_name or "").lower()
+    name_match_re = _SET_NAME_MATCH_RES.get(set_lower)
+    if name_match_re is None:
+        set_patterns = SET_SPECIFIC_SEALED_PATTERNS.get(set_lower)
+        if set_patterns:
+            name_match_re = re.compile(
+                _NAME_MATCH_PATTERN +
+                r"|(?P<set_sealed>" + "|".join(re.escape(p) for p in set_patterns) + r")",
+                re.IGNORECASE,
+            )
+        else:
+            name_match_re = _NAME_MATCH_RE
+        _SET_NAME_MATCH_RES[set_lower] = name_match_re
+    return name_match_re
 
 
 def is_sealed_preconstructed_product_name(name: str) -> bool:
@@ -52,14 +136,9 @@ def is_sealed_preconstructed_product_name(name: str) -> bool:
     Determine if a product is a sealed preconstructed product.
     Includes deck boxes and decks without parentheses.
     """
-    if not name:
+    if not name or len(name) < _MIN_PRECON_NAME_LEN:
         return False
-    n = name.lower()
-    return (
-        "preconstructed deck box" in n or
-        "preconstructed deck:" in n or
-        ("preconstructed deck" in n and "(" not in name)
-    )
+    return _is_sealed_precon_mask(name, _match_name_categories(name))
 
 
 def is_preconstructed_single_name(name: str) -> bool:
@@ -76,25 +155,54 @@ def is_sealed_product_name(name: str, set_name: str = "") -> bool:
     Includes sealed preconstructed products (deck boxes, decks without parentheses).
     Excludes single cards like "(Pledge Pack)" or "(Preconstructed Deck)" items.
     """
-    if not name:
+    if not name or len(name) < _MIN_SEALED_NAME_LEN:
         return False
 
+    mask = _match_name_categories(name, _name_match_re_for_set(set_name))
+
     # Exclude single cards with parentheses (these are individual cards, not sealed)
-    if "(Pledge Pack)" in name or "(Preconstructed Deck)" in name:
+    if mask & (_NAME_MATCH_PLEDGE_SINGLE | _NAME_MATCH_PRECON_SINGLE):
         return False
 
-    n = name.lower()
-    set_lower = (set_name or "").lower()
-
     # Check for sealed preconstructed products first
-    if is_sealed_preconstructed_product_name(name):
+    if _is_sealed_precon_mask(name, mask):
         return True
 
-    # Check for set-specific sealed products
-    for base, pattern in SET_SPECIFIC_SEALED_PATTERNS:
-        if base in set_lower and pattern in n:
-            return True
+    # Check for set-specific sealed products and general sealed keywords
+    return bool(mask & (_NAME_MATCH_SET_SEALED | _NAME_MATCH_SEALED_KEYWORD))
 
-    # Check for general sealed keywords
-    return any(keyword in n for keyword in SEALED_KEYWORDS)
 
+def classify_products(names: list, set_names: list) -> list:
+    """
+    Classify a batch of products in a single pass.
+    Takes parallel lists of product names and set names and returns a list of
+    PRODUCT_FLAG_* bitmasks, one per product.
+    """
+    flags = []
+    append = flags.append
+    # Set names repeat across a batch, so resolve each distinct set's matcher only once
+    set_match_re_cache = {}
+    for name, set_name in zip(names, set_names):
+        if not name or len(name) < _MIN_SEALED_NAME_LEN:
+            append(0)
+            continue
+
+        name_match_re = set_match_re_cache.get(set_name)
+        if name_match_re is None:
+            name_match_re = set_match_re_cache[set_name] = _name_match_re_for_set(set_name)
+
+        # One regex scan covers every category, including the set-specific sealed patterns
+        match_mask = _match_name_categories(name, name_match_re)
+        is_sealed_precon = _is_sealed_precon_mask(name, match_mask)
+        mask = 0
+        if is_sealed_precon:
+            mask |= PRODUCT_FLAG_SEALED_PRECON
+        if match_mask & _NAME_MATCH_PRECON_SINGLE:
+            mask |= PRODUCT_FLAG_PRECON_SINGLE
+        elif not match_mask & _NAME_MATCH_PLEDGE_SINGLE and (
+            is_sealed_precon or
+            match_mask & (_NAME_MATCH_SEALED_KEYWORD | _NAME_MATCH_SET_SEALED)
+        ):
+            mask |= PRODUCT_FLAG_SEALED
+        append(mask)
+    return flags
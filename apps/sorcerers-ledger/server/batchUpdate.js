@@ -109,23 +109,23 @@ function runBatchUpdate() {
       stdio: ['ignore', 'pipe', 'pipe']
     });
 
-    let stdout = '';
-    let stderr = '';
+    // Collect raw output chunks and decode them once at the end (decoding each chunk
+    // separately can split multi-byte characters across chunk boundaries)
+    const stdoutChunks = [];
+    const stderrChunks = [];
 
     pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      stdout += output;
+      stdoutChunks.push(data);
       // Write to log file and console
-      logStream.write(output);
-      process.stdout.write(output);
+      logStream.write(data);
+      process.stdout.write(data);
     });
 
     pythonProcess.stderr.on('data', (data) => {
-      const error = data.toString();
-      stderr += error;
+      stderrChunks.push(data);
       // Write to log file and console
-      logStream.write(error);
-      process.stderr.write(error);
+      logStream.write(data);
+      process.stderr.write(data);
     });
 
     pythonProcess.on('close', (code) => {
@@ -145,8 +145,8 @@ function runBatchUpdate() {
       
       resolve({
         success,
-        output: stdout,
-        error: stderr,
+        output: Buffer.concat(stdoutChunks).toString(),
+        error: Buffer.concat(stderrChunks).toString(),
         exitCode: code,
         logFile: logFilePath
       });
@@ -159,7 +159,7 @@ function runBatchUpdate() {
       
       resolve({
         success: false,
-        output: stdout,
+        output: Buffer.concat(stdoutChunks).toString(),
         error: error.message,
         exitCode: -1,
         logFile: logFilePath
@@ -4,9 +4,12 @@ Handles archiving, cleanup, and coordination of product info and pricing generat
 """
 
 import os
-import json
+import errno
+import logging
+import re
+import shutil
 from datetime import datetime, timedelta
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Sequence
 import sys
 
 # Add parent directory to path for imports
@@ -15,77 +18,110 @@ core_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.insert(0, core_dir)
 
 from core.python.shared.shared_logger import logger
-from core.python.pricing_pipeline.product_info_core import generate_product_info_files
-from core.python.pricing_pipeline.pricing_core import generate_card_data_from_tcgplayer
 
+# Archived card data files: card_data_YYYYMMDD_HHMMSS.json (group 1 is the date)
+_ARCHIVE_FILENAME_RE = re.compile(r"card_data_([0-9]{8})_[0-9]{6}\.json")
 
-def cleanup_old_archives(card_data_dir: str, days_to_keep: int = 8):
+
+def cleanup_old_archives(card_data_dir: str, days_to_keep: int = 8, now: datetime = None,
+                         marker_path: str = None):
     """
     Delete archived card_data.json files older than the specified number of days.
     Only deletes files matching the pattern card_data_YYYYMMDD_HHMMSS.json
+    With a marker_path, the scan is skipped if it already ran the same day.
     
     Args:
         card_data_dir: Directory containing card data files
         days_to_keep: Number of days to keep archived files (default: 8)
+        now: Reference time for the cutoff (default: current time)
+        marker_path: File whose mtime records the last cleanup; keep it outside
+            card_data_dir, which is served publicly (default: always scan)
     """
-    if not os.path.exists(card_data_dir):
-        return
-    
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
+    today = now.date()
     cutoff_date = now - timedelta(days=days_to_keep)
-    deleted_count = 0
+    # Filename dates are compared as YYYYMMDD integers, so the keep/delete decision
+    # needs no stat or date parsing (zero-padded YYYYMMDD orders the same as the date)
+    cutoff_int = cutoff_date.year * 10000 + cutoff_date.month * 100 + cutoff_date.day
+    deleted_files = []
+    log_each_file = logger.isEnabledFor(logging.DEBUG)
+    
+    # Archives only cross the cutoff once per day, so a second scan on the same day
+    # can't find anything new to delete
+    if marker_path:
+        try:
+            if datetime.fromtimestamp(os.stat(marker_path).st_mtime).date() == today:
+                return
+        except FileNotFoundError:
+            pass
     
     try:
-        for filename in os.listdir(card_data_dir):
-            # Only process archived files (card_data_YYYYMMDD_HHMMSS.json), not the main card_data.json
-            if filename.startswith("card_data_") and filename.endswith(".json") and filename != "card_data.json":
-                file_path = os.path.join(card_data_dir, filename)
-                
-                # Extract date from filename: card_data_YYYYMMDD_HHMMSS.json
-                try:
-                    # Remove prefix "card_data_" and suffix ".json"
-                    date_time_str = filename[10:-5]  # "card_data_" is 10 chars, ".json" is 5 chars
-                    # Split by underscore to get date and time parts
-                    date_str = date_time_str.split('_')[0]  # "20251118"
-                    # Parse the date: YYYYMMDD
-                    file_date_from_name = datetime.strptime(date_str, "%Y%m%d")
-                    
-                    file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    
-                    # Calculate days since file date
-                    days_old = (now.date() - file_date_from_name.date()).days
-                    
-                    # Delete if the date in the filename is older than the cutoff
-                    if file_date_from_name.date() < cutoff_date.date():
-                        os.remove(file_path)
-                        deleted_count += 1
-                        logger.info(f"Deleted old archive: {filename} (filename date: {file_date_from_name.date()}, mtime: {file_mtime.date()}, {days_old} days old)")
-                except (ValueError, IndexError) as e:
-                    # If filename doesn't match expected format, skip it
-                    logger.warning(f"Could not parse date from filename '{filename}': {e}")
+        # os.scandir streams entries lazily (glob.iglob is built on it) and its DirEntry
+        # objects let deleted files be stat'ed without an extra path lookup
+        entries = os.scandir(card_data_dir)
+    except FileNotFoundError:
+        # No card data directory yet, nothing to clean up
+        return
+    
+    try:
+        with entries:
+            for entry in entries:
+                filename = entry.name
+                # Only process archived files (card_data_YYYYMMDD_HHMMSS.json), not the main card_data.json
+                if not filename.startswith("card_data_") or not filename.endswith(".json"):
+                    continue
+                match = _ARCHIVE_FILENAME_RE.fullmatch(filename)
+                if not match:
+                    # Looks like an archive but will never be cleaned up, so make it visible
+                    logger.warning(f"Could not parse date from filename '{filename}'")
                     continue
+                date_str = match.group(1)  # "20251118"
+                
+                # Delete if the date in the filename is older than the cutoff
+                if int(date_str) < cutoff_int:
+                    if log_each_file:
+                        # Per-file details (date parsing and the stat for mtime) only when debug logging is on
+                        file_mtime = datetime.fromtimestamp(entry.stat().st_mtime)
+                        try:
+                            file_date_from_name = datetime.strptime(date_str, "%Y%m%d").date()
+                            age = f"filename date: {file_date_from_name}, {(today - file_date_from_name).days} days old"
+                        except ValueError:
+                            age = f"filename date: {date_str}"
+                        logger.debug(f"Deleting old archive: {filename} ({age}, mtime: {file_mtime.date()})")
+                    os.remove(entry.path)
+                    deleted_files.append(filename)
+        
+        if deleted_files:
+            shown = ", ".join(sorted(deleted_files)[:5])
+            more = f" (+{len(deleted_files) - 5} more)" if len(deleted_files) > 5 else ""
+            logger.info(f"Cleaned up {len(deleted_files)} archived file(s) older than {days_to_keep} days: {shown}{more}")
         
-        if deleted_count > 0:
-            logger.info(f"Cleaned up {deleted_count} archived file(s) older than {days_to_keep} days.")
+        if marker_path:
+            # Record the cleanup at the reference time (not the wall clock) so injected times stay consistent
+            with open(marker_path, 'a'):
+                pass
+            marker_time = now.timestamp()
+            os.utime(marker_path, (marker_time, marker_time))
     except Exception as e:
         logger.error(f"Error cleaning up old archives: {e}")
 
 
 def run_batch_update(
     set_group_ids: Dict[str, int],
-    rarities: list,
+    rarities: Sequence[str],
     product_type_id: int,
     rarity_normalizer: Dict[str, str],
     output_file_path: str,
     card_data_dir: str,
     product_info_dir: str,
-    is_sealed_precon_name_fn: Callable[[str], bool],
-    is_precon_single_name_fn: Callable[[str], bool],
-    is_sealed_name_fn: Callable[[str, str], bool],
+    classify_products_fn: Callable[[List[str], List[str]], List[int]],
     test_mode: bool = False,
     test_set_name: str = None,
     cache_duration_hours: int = 24,
-    days_to_keep_archives: int = 8
+    days_to_keep_archives: int = 8,
+    now: datetime = None,
+    cleanup_marker_path: str = None
 ):
     """
     Run the complete batch update process for a game.
@@ -98,31 +134,49 @@ def run_batch_update(
         output_file_path: Path to output card_data.json file
         card_data_dir: Directory containing card data files
         product_info_dir: Directory containing product info files
-        is_sealed_precon_name_fn: Function to check if a product name is a sealed preconstructed product
-        is_precon_single_name_fn: Function to check if a product name is a preconstructed single
-        is_sealed_name_fn: Function to check if a product name is a sealed product
+        classify_products_fn: Function to classify a batch of product names (see pricing_core flags)
         test_mode: If True, only process test set
         test_set_name: Set name to test (if test_mode is True)
-        cache_duration_hours: How long to consider card_data.json fresh (not used currently, kept for compatibility)
+        cache_duration_hours: Age in hours after which product info files are refetched
         days_to_keep_archives: Number of days to keep archived files
+        now: Reference time for archiving and cleanup (default: current time)
+        cleanup_marker_path: Marker file letting archive cleanup run once per day (default: every run)
     """
+    if now is None:
+        now = datetime.now()
+    
     logger.info("*" * 60)
     logger.info("Starting batch update process...")
     logger.info("*" * 60)
     
     # Archive existing card_data.json only if it's from a previous day
-    if os.path.exists(output_file_path):
-        modified_time = datetime.fromtimestamp(os.path.getmtime(output_file_path))
-        today = datetime.now().date()
+    # (single stat call covers both the existence check and the mtime)
+    try:
+        output_stat = os.stat(output_file_path)
+    except FileNotFoundError:
+        output_stat = None
+    
+    if output_stat is not None:
+        modified_time = datetime.fromtimestamp(output_stat.st_mtime)
+        today = now.date()
         file_date = modified_time.date()
         
         # Only archive if file is from a previous day
         if file_date < today:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             archive_file = os.path.join(card_data_dir, f"card_data_{timestamp}.json")
             
-            # Rename current file to archived name
-            os.rename(output_file_path, archive_file)
+            # Move current file to archived name (atomic and O(1) on the same filesystem;
+            # os.replace behaves the same on Windows, where os.rename fails if the target exists)
+            try:
+                os.replace(output_file_path, archive_file)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Archive dir is on another filesystem; hardlinks can't cross devices either,
+                # so this is the only case that falls back to copy + delete
+                logger.warning(f"Archive directory is on a different filesystem, moving {output_file_path} by copy")
+                shutil.move(output_file_path, archive_file)
             logger.info(f"Archived previous day's card_data.json to {archive_file}")
         else:
             logger.info(f"Found existing card_data.json (last updated {modified_time.strftime('%Y-%m-%d %H:%M:%S')}). Will resume from existing data.")
@@ -133,37 +187,47 @@ def run_batch_update(
     logger.info("=" * 60)
     logger.info("Checking product info files from TCGplayer catalog...")
     logger.info("=" * 60)
-    logger.info("(Product info files are only generated if they don't already exist)")
-    generate_product_info_files(
-        set_group_ids=set_group_ids,
-        product_type_id=product_type_id,
-        rarity_normalizer=rarity_normalizer,
-        output_dir=product_info_dir
+    logger.info(f"(Product info files are only generated if missing or older than {cache_duration_hours} hours)")
+    # Pipeline modules are imported lazily so the archive/cleanup phase doesn't pay for them
+    from core.python.pricing_pipeline.product_info_core import (
+        all_product_info_files_fresh,
+        generate_product_info_files,
     )
+    if all_product_info_files_fresh(set_group_ids.keys(), product_info_dir, max_age_hours=cache_duration_hours):
+        # Skip generation entirely (no bearer token or API setup needed)
+        logger.info(f"All {len(set_group_ids)} product info files are up to date. Skipping generation.")
+    else:
+        generate_product_info_files(
+            set_group_ids=set_group_ids,
+            product_type_id=product_type_id,
+            rarity_normalizer=rarity_normalizer,
+            output_dir=product_info_dir,
+            max_age_hours=cache_duration_hours
+        )
     logger.info("Product info files check complete.")
     
     # Generate card data from TCGplayer
     logger.info("=" * 60)
     logger.info("Starting TCGplayer card data parsing...")
     logger.info("=" * 60)
-    generate_card_data_from_tcgplayer(
+    from core.python.pricing_pipeline.pricing_core import generate_card_data_from_tcgplayer
+    card_data_saved = generate_card_data_from_tcgplayer(
         output_file_path=output_file_path,
         set_group_ids=set_group_ids,
         rarities=rarities,
         product_type_id=product_type_id,
         product_info_dir=product_info_dir,
-        is_sealed_precon_name_fn=is_sealed_precon_name_fn,
-        is_precon_single_name_fn=is_precon_single_name_fn,
-        is_sealed_name_fn=is_sealed_name_fn,
+        classify_products_fn=classify_products_fn,
         test_mode=test_mode,
         test_set_name=test_set_name
     )
     logger.info("TCGplayer card data parsing complete.")
     
     # Log successful completion
-    if os.path.exists(output_file_path):
+    if card_data_saved:
         logger.info(f"New card_data.json generated at {output_file_path}")
     
     # Clean up old archived files
-    cleanup_old_archives(card_data_dir, days_to_keep=days_to_keep_archives)
+    cleanup_old_archives(card_data_dir, days_to_keep=days_to_keep_archives, now=now,
+                         marker_path=cleanup_marker_path)
 
@@ -4,10 +4,15 @@ Fetches pricing data from TCGplayer API using group IDs and maps it to the card
 This is a generic version that accepts game configuration.
 """
 
-import json
 import os
 import sys
-from typing import Dict, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, Callable, List, Sequence
+
+import orjson
 
 # Add parent directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,14 +20,59 @@ core_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.insert(0, core_dir)
 
 from core.python.pricing_pipeline.tcgplayer_api import get_bearer_token, fetch_group_pricing
+from core.python.pricing_pipeline.product_info_core import get_product_info_file_path
 from core.python.shared.shared_logger import logger
 
+# Bitmask contract for the flags returned by classify_products_fn
+SEALED_FLAG = 1          # Sealed product (booster boxes, cases, packs, sealed precons)
+PRECON_SINGLE_FLAG = 2   # Single card from a preconstructed deck
+SEALED_PRECON_FLAG = 4   # Sealed preconstructed product (deck box, deck without parentheses)
+
+# Card price fields: floats on CardInfo, written to card_data.json as 2-decimal strings
+PRICE_FIELDS = ("tcgplayerLowPrice", "tcgplayerMidPrice", "tcgplayerHighPrice", "tcgplayerMarketPrice")
+
+# Concurrent group pricing requests (stays within the API session's connection pool)
+PRICING_FETCH_MAX_WORKERS = 10
+
+
+@dataclass(slots=True)
+class CardInfo:
+    """
+    A card entry in card_data.json. Field names are the JSON keys, in output order;
+    prices are formatted as strings only when serialized (see _card_to_json).
+    """
+    name: str
+    tcgplayerProductId: int  # Product ID for image lookup
+    tcgplayerLowPrice: float
+    tcgplayerMidPrice: float
+    tcgplayerHighPrice: float
+    tcgplayerMarketPrice: float  # Original from API (0 if not available)
+    set_name: str
+    
+    @classmethod
+    def from_dict(cls, card: dict) -> "CardInfo":
+        """Build a card from a card_data.json entry, parsing its price strings."""
+        return cls(
+            card.get("name", ""),
+            card.get("tcgplayerProductId"),
+            *(_safe_float(card.get(field)) for field in PRICE_FIELDS),
+            card.get("set_name", ""),
+        )
+
 
 def _load_existing_card_data(output_file_path: str) -> dict:
-    """Load existing card data from file."""
+    """Load existing card data from file, converting card entries to CardInfo."""
     try:
-        with open(output_file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(output_file_path, 'rb') as f:
+            all_sets_data = orjson.loads(f.read())
+        for set_data in all_sets_data.values():
+            for key, value in set_data.items():
+                if isinstance(value, dict):
+                    for rarity, cards in value.items():
+                        value[rarity] = [CardInfo.from_dict(card) for card in cards]
+                else:
+                    set_data[key] = [CardInfo.from_dict(card) for card in value]
+        return all_sets_data
     except FileNotFoundError:
         return {}
     except Exception as e:
@@ -30,13 +80,61 @@ def _load_existing_card_data(output_file_path: str) -> dict:
         return {}
 
 
-def _save_card_data_intermediate(data: dict, output_file_path: str):
-    """Save card data to file."""
+def _card_to_json(card: CardInfo) -> dict:
+    """A card's card_data.json object, with its prices formatted as 2-decimal strings."""
+    return {
+        "name": card.name,
+        "tcgplayerProductId": card.tcgplayerProductId,
+        **{field: f"{getattr(card, field):.2f}" for field in PRICE_FIELDS},
+        "set_name": card.set_name,
+    }
+
+
+def _serialize_set_data(set_data: dict) -> bytes:
+    """Serialize one set's data as an indented JSON object (orjson emits UTF-8 bytes)."""
+    # The same card objects appear in several of a set's lists, so each is converted once
+    card_objects = {}
+    
+    def default(obj):
+        if isinstance(obj, CardInfo):
+            card_object = card_objects.get(id(obj))
+            if card_object is None:
+                card_object = card_objects[id(obj)] = _card_to_json(obj)
+            return card_object
+        raise TypeError
+    
+    return orjson.dumps(set_data, default=default, option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def _save_card_data_intermediate(set_chunks: Dict[str, bytes], output_file_path: str) -> bool:
+    """
+    Save card data to file from per-set serialized chunks. Returns True if the file was written.
+    Each set is serialized once (by _serialize_set_data) and the chunks are spliced into the
+    combined object, so saving never re-serializes sets that are already done. The result is
+    byte-identical to indenting the whole dict at once: JSON strings never contain raw newlines,
+    so nesting a chunk one level deeper only means indenting each of its lines.
+    The file is written to a temp file next to the output and swapped in, so a crash
+    mid-write never leaves a truncated card_data.json for the next run to resume from.
+    """
+    tmp_path = f"{output_file_path}.tmp"
     try:
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        if set_chunks:
+            members = b",\n".join(
+                b"  " + orjson.dumps(set_name) + b": " + chunk.replace(b"\n", b"\n  ")
+                for set_name, chunk in set_chunks.items()
+            )
+            payload = b"{\n" + members + b"\n}"
+        else:
+            payload = b"{}"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, output_file_path)
+        return True
     except Exception as e:
         logger.error(f"Error saving card data: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
 
 
 def _load_product_info_file(set_name: str, product_info_dir: str = "card-data/product-info") -> Dict[int, dict]:
@@ -50,20 +148,14 @@ def _load_product_info_file(set_name: str, product_info_dir: str = "card-data/pr
     Returns:
         Dictionary mapping product_id -> product info
     """
-    safe_set_name = set_name.replace(" ", "_").replace("/", "_")
-    product_info_file = os.path.join(product_info_dir, f"product_info_{safe_set_name}.json")
+    product_info_file = get_product_info_file_path(set_name, product_info_dir)
     
     try:
-        with open(product_info_file, 'r', encoding='utf-8') as f:
-            product_info_list = json.load(f)
+        with open(product_info_file, 'rb') as f:
+            product_info_list = orjson.loads(f.read())
         
-        product_map = {}
-        for product in product_info_list:
-            product_id = product.get("productId")
-            if product_id:
-                product_map[product_id] = product
-        
-        return product_map
+        # Products without a productId can't be joined to pricing data, so they're left out
+        return {product["productId"]: product for product in product_info_list if product.get("productId")}
     except FileNotFoundError:
         logger.warning(f"Product info file not found: {product_info_file}")
         return {}
@@ -72,36 +164,105 @@ def _load_product_info_file(set_name: str, product_info_dir: str = "card-data/pr
         return {}
 
 
-def _create_price_mapping_from_group_pricing(pricing_data: dict) -> Dict[int, dict]:
+def _fetch_all_group_pricing(
+    set_group_ids: Dict[str, int],
+    product_type_id: int,
+    bearer_token: str,
+    max_workers: int = PRICING_FETCH_MAX_WORKERS
+) -> Dict[str, dict]:
     """
-    Create a mapping of product ID to pricing information from group pricing response.
+    Fetch group pricing for several sets concurrently.
     
     Args:
-        pricing_data: API response from fetch_group_pricing
+        set_group_ids: Dictionary mapping set name -> group ID
+        product_type_id: Product type ID
+        bearer_token: Bearer token for API authentication
+        max_workers: Maximum number of requests in flight at once
         
     Returns:
-        Dictionary mapping product_id -> pricing info
+        Dictionary mapping set name -> API response (None if the fetch failed)
+    """
+    if not set_group_ids:
+        return {}
+    
+    group_pricing = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(set_group_ids))) as executor:
+        future_to_set = {}
+        for set_name, group_id in set_group_ids.items():
+            logger.info(f"Fetching pricing data for group {group_id}...")
+            future = executor.submit(fetch_group_pricing, group_id, product_type_id, bearer_token)
+            future_to_set[future] = set_name
+        for future in as_completed(future_to_set):
+            group_pricing[future_to_set[future]] = future.result()
+    return group_pricing
+
+
+def _safe_float(value, default=0.0):
+    """Convert value to float, handling None values."""
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _name_sort_key(card: CardInfo) -> str:
+    """Sort key for case-insensitive name ordering."""
+    return (card.name or "").lower()
+
+
+def _sorted_with_key_cache(cards, key_fn, key_cache: dict, reverse: bool = False):
+    """
+    Sort cards, computing each card object's key at most once per key_cache.
+    The same card objects appear in several lists of a set (e.g. nonFoil and
+    nonFoilByRarityName), so sharing a cache avoids recomputing their keys.
+    """
+    def cached_key(card):
+        card_id = id(card)
+        key = key_cache.get(card_id)
+        if key is None:
+            key = key_cache[card_id] = key_fn(card)
+        return key
+    return sorted(cards, key=cached_key, reverse=reverse)
+
+
+def _sort_by_price(cards):
+    """Sort cards by TCGplayer market price (highest first); prices are floats at this point."""
+    return sorted(cards, key=attrgetter("tcgplayerMarketPrice"), reverse=True)
+
+
+def _sort_by_name(cards, key_cache: dict):
+    """Sort cards case-insensitively by name for consistent ordering."""
+    return _sorted_with_key_cache(cards, _name_sort_key, key_cache)
+
+
+def _finalize_set_data(set_data: dict, rarities: Sequence[str]) -> bytes:
     """
-    price_map = {}
+    Sort a finished set's lists and serialize it.
     
-    if not pricing_data or not pricing_data.get("success"):
-        return price_map
+    Args:
+        set_data: The set's card lists (modified in place)
+        rarities: List of rarity names for this game
+        
+    Returns:
+        The set serialized by _serialize_set_data
+    """
+    # Name keys are computed once per card object and shared across this set's lists
+    name_keys = {}
     
-    results = pricing_data.get("results", [])
+    for list_key in ("nonFoil", "foil", "sealed", "preconstructed"):
+        set_data[list_key] = _sort_by_price(set_data[list_key])
+        set_data[f"{list_key}ByName"] = _sort_by_name(set_data[list_key], name_keys)
     
-    for price_info in results:
-        product_id = price_info.get("productId")
-        if product_id:
-            price_map[product_id] = {
-                "lowPrice": price_info.get("lowPrice", 0),
-                "midPrice": price_info.get("midPrice", 0),
-                "highPrice": price_info.get("highPrice", 0),
-                "marketPrice": price_info.get("marketPrice", 0),
-                "directLowPrice": price_info.get("directLowPrice"),
-                "subTypeName": price_info.get("subTypeName", ""),  # "Normal" or "Foil"
-            }
+    for rarity_key in rarities:
+        for prefix in ("nonFoil", "foil"):
+            by_rarity_price = set_data[f"{prefix}ByRarityPrice"]
+            by_rarity_name = set_data[f"{prefix}ByRarityName"]
+            by_rarity_price[rarity_key] = _sort_by_price(by_rarity_price[rarity_key])
+            by_rarity_name[rarity_key] = _sort_by_name(by_rarity_name[rarity_key], name_keys)
     
-    return price_map
+    return _serialize_set_data(set_data)
 
 
 def _is_foil_product(sub_type_name: str) -> bool:
@@ -112,15 +273,13 @@ def _is_foil_product(sub_type_name: str) -> bool:
 def generate_card_data_from_tcgplayer(
     output_file_path: str,
     set_group_ids: Dict[str, int],
-    rarities: list,
+    rarities: Sequence[str],
     product_type_id: int,
     product_info_dir: str,
-    is_sealed_precon_name_fn: Callable[[str], bool],
-    is_precon_single_name_fn: Callable[[str], bool],
-    is_sealed_name_fn: Callable[[str, str], bool],
+    classify_products_fn: Callable[[List[str], List[str]], List[int]],
     test_mode: bool = False,
     test_set_name: str = None
-):
+) -> bool:
     """
     Generate card data JSON from TCGplayer API pricing data using group IDs.
     
@@ -130,15 +289,21 @@ def generate_card_data_from_tcgplayer(
         rarities: List of rarity names for this game
         product_type_id: Product type ID
         product_info_dir: Directory containing product info files
-        is_sealed_precon_name_fn: Function to check if a product name is a sealed preconstructed product
-        is_precon_single_name_fn: Function to check if a product name is a preconstructed single
-        is_sealed_name_fn: Function to check if a product name is a sealed product (takes name and set_name)
+        classify_products_fn: Function taking parallel lists of product names and set names and
+                              returning a bitmask per product (SEALED_FLAG, PRECON_SINGLE_FLAG,
+                              SEALED_PRECON_FLAG)
         test_mode: If True, only process test set
         test_set_name: Set name to test (if test_mode is True)
+        
+    Returns:
+        True if card data was saved to output_file_path, False otherwise
     """
     logger.info("Starting TCGplayer card data generation using group IDs...")
     logger.info(f"Processing {len(set_group_ids)} sets")
     
+    # Hash-based membership for the per-product rarity check
+    rarities_set = frozenset(rarities)
+    
     # Load existing card data for resume functionality
     all_sets_processed_data = _load_existing_card_data(output_file_path)
     
@@ -146,14 +311,21 @@ def generate_card_data_from_tcgplayer(
     bearer_token = get_bearer_token()
     if not bearer_token:
         logger.error("Could not obtain TCGplayer bearer token")
-        return
+        return False
+    
+    # Test mode filter
+    if test_mode:
+        set_group_ids = {name: gid for name, gid in set_group_ids.items() if name == test_set_name}
+    
+    # Fetch pricing for all groups up front; the requests are network-bound and run concurrently,
+    # while categorization below stays in this thread
+    group_pricing = _fetch_all_group_pricing(set_group_ids, product_type_id, bearer_token)
+    
+    # Serialized JSON of each set finished in this run
+    finished_set_chunks = {}
     
     # Process each set
     for set_name, group_id in set_group_ids.items():
-        # Test mode filter
-        if test_mode and set_name != test_set_name:
-            continue
-        
         logger.info("=" * 60)
         logger.info(f"Processing set: {set_name} (Group ID: {group_id})")
         logger.info("=" * 60)
@@ -186,31 +358,44 @@ def generate_card_data_from_tcgplayer(
         
         logger.info(f"Loaded product info for {len(product_info_map)} products")
         
-        # Fetch pricing data for the group
-        logger.info(f"Fetching pricing data for group {group_id}...")
-        pricing_data = fetch_group_pricing(group_id, product_type_id, bearer_token)
+        # Pricing data for the group (fetched above)
+        pricing_data = group_pricing.get(set_name)
         
         if not pricing_data:
             logger.error(f"Could not fetch pricing data for {set_name}")
             continue
         
-        # Create mapping of product ID to pricing
-        price_map = _create_price_mapping_from_group_pricing(pricing_data)
-        logger.info(f"Loaded pricing data for {len(price_map)} products")
+        pricing_results = pricing_data.get("results", [])
+        logger.info(f"Loaded {len(pricing_results)} pricing entries")
         
         # Create a set of existing product IDs to avoid duplicates
-        existing_product_ids = set()
-        for card_list in [set_data.get("nonFoil", []), set_data.get("foil", []), 
-                          set_data.get("sealed", []), set_data.get("preconstructed", [])]:
-            for card in card_list:
-                product_id = card.get("tcgplayerProductId")
-                if product_id:
-                    existing_product_ids.add(product_id)
+        existing_product_ids = {
+            card.tcgplayerProductId
+            for card in chain(set_data.get("nonFoil", ()), set_data.get("foil", ()),
+                              set_data.get("sealed", ()), set_data.get("preconstructed", ()))
+            if card.tcgplayerProductId
+        }
         
-        # Process each product with pricing data
+        # Collect products with pricing data that still need processing
         processed_count = 0
         skipped_count = 0
-        for product_id, price_info in price_map.items():
+        pending_products = []
+        append_pending = pending_products.append
+        # product_id -> index in pending_products (None if the product was skipped). A product can
+        # have more than one pricing entry; its last entry's pricing is used, at its first position.
+        seen_products = {}
+        for price_info in pricing_results:
+            product_id = price_info.get("productId")
+            if not product_id:
+                continue
+            if product_id in seen_products:
+                pending_index = seen_products[product_id]
+                if pending_index is not None:
+                    _, _, product_details, product_name = pending_products[pending_index]
+                    pending_products[pending_index] = (product_id, price_info, product_details, product_name)
+                continue
+            seen_products[product_id] = None
+            
             # Skip if product already exists (avoid duplicates when resuming)
             if product_id in existing_product_ids:
                 skipped_count += 1
@@ -225,6 +410,24 @@ def generate_card_data_from_tcgplayer(
             if not product_name:
                 continue
             
+            seen_products[product_id] = len(pending_products)
+            append_pending((product_id, price_info, product_details, product_name))
+        
+        # Classify all pending products in one batch call
+        product_names = [product[3] for product in pending_products]
+        product_flags = classify_products_fn(product_names, [set_name] * len(product_names))
+        
+        # Bind this set's category lists (and their appends) once instead of re-indexing them per product
+        append_sealed = set_data["sealed"].append
+        append_precon = set_data["preconstructed"].append
+        append_foil = set_data["foil"].append
+        append_non_foil = set_data["nonFoil"].append
+        foil_by_rarity_price = set_data["foilByRarityPrice"]
+        foil_by_rarity_name = set_data["foilByRarityName"]
+        non_foil_by_rarity_price = set_data["nonFoilByRarityPrice"]
+        non_foil_by_rarity_name = set_data["nonFoilByRarityName"]
+        
+        for (product_id, price_info, product_details, product_name), flags in zip(pending_products, product_flags):
             # Check categorization order matters:
             # 1. Check if sealed preconstructed product (deck box, deck without parentheses) -> sealed
             # 2. Check if preconstructed single (has "(Preconstructed Deck)") -> preconstructed
@@ -232,14 +435,14 @@ def generate_card_data_from_tcgplayer(
             # 4. Otherwise -> regular card (nonFoil/foil)
             
             # Check for sealed preconstructed products first (these go to sealed, not preconstructed)
-            is_sealed_precon = is_sealed_precon_name_fn(product_name)
+            is_sealed_precon = bool(flags & SEALED_PRECON_FLAG)
             
             # Check for preconstructed singles (only items with "(Preconstructed Deck)")
-            is_preconstructed = is_precon_single_name_fn(product_name) if not is_sealed_precon else False
+            is_preconstructed = bool(flags & PRECON_SINGLE_FLAG) if not is_sealed_precon else False
             
             # Determine if this is a sealed product (booster boxes, cases, packs, sealed precons)
             # Exclude "(Pledge Pack)" singles - those are regular cards
-            is_sealed = is_sealed_precon or (is_sealed_name_fn(product_name, set_name) if not is_preconstructed else False)
+            is_sealed = is_sealed_precon or (bool(flags & SEALED_FLAG) if not is_preconstructed else False)
             
             # Determine if this is a foil product (only for individual cards, not sealed or preconstructed)
             # Check both subTypeName and product name for foil indication
@@ -247,60 +450,50 @@ def generate_card_data_from_tcgplayer(
             if not is_sealed and not is_preconstructed:
                 is_foil = _is_foil_product(price_info.get("subTypeName", "")) or "(Foil)" in product_name
             
-            # Helper function to safely convert price values (handles None)
-            def safe_float(value, default=0.0):
-                """Convert value to float, handling None values."""
-                if value is None:
-                    return default
-                try:
-                    return float(value)
-                except (ValueError, TypeError):
-                    return default
-            
-            # Extract pricing
-            low_price = safe_float(price_info.get("lowPrice"))
-            mid_price = safe_float(price_info.get("midPrice"))
-            high_price = safe_float(price_info.get("highPrice"))
-            market_price = safe_float(price_info.get("marketPrice"))
+            # Extract pricing (rounded to cents so sorting matches the written values)
+            low_price = round(_safe_float(price_info.get("lowPrice")), 2)
+            mid_price = round(_safe_float(price_info.get("midPrice")), 2)
+            high_price = round(_safe_float(price_info.get("highPrice")), 2)
+            market_price = round(_safe_float(price_info.get("marketPrice")), 2)
             # Store original market price (will be 0 if not available from TCGplayer)
             # Don't fall back to mid - store 0 if market price is not available
             
             # Get rarity from product info (only for individual cards, not sealed)
             rarity = product_details.get("rarity", "") if not is_sealed else ""
             
-            # Create card info object
-            card_info = {
-                "name": product_name,
-                "tcgplayerProductId": product_id,  # Store product ID for image lookup
-                "tcgplayerLowPrice": f"{low_price:.2f}",
-                "tcgplayerMidPrice": f"{mid_price:.2f}",
-                "tcgplayerHighPrice": f"{high_price:.2f}",
-                "tcgplayerMarketPrice": f"{market_price:.2f}",  # Original from API (0 if not available)
-                "set_name": set_name,
-            }
+            # Create card info object (prices are formatted when the set is serialized)
+            card_info = CardInfo(
+                product_name,
+                product_id,
+                low_price,
+                mid_price,
+                high_price,
+                market_price,
+                set_name,
+            )
             
             # Route to appropriate category
             if is_sealed:
                 # Add to sealed products list (booster boxes, deck boxes, etc.)
-                all_sets_processed_data[set_name]["sealed"].append(card_info)
+                append_sealed(card_info)
             elif is_preconstructed:
                 # Add to preconstructed cards list (individual cards from preconstructed decks)
-                all_sets_processed_data[set_name]["preconstructed"].append(card_info)
+                append_precon(card_info)
             else:
                 # Add to rarity-grouped lists if rarity is available
-                if rarity and rarity in rarities:
+                if rarity and rarity in rarities_set:
                     if is_foil:
-                        all_sets_processed_data[set_name]["foilByRarityPrice"][rarity].append(card_info)
-                        all_sets_processed_data[set_name]["foilByRarityName"][rarity].append(card_info)
+                        foil_by_rarity_price[rarity].append(card_info)
+                        foil_by_rarity_name[rarity].append(card_info)
                     else:
-                        all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity].append(card_info)
-                        all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity].append(card_info)
+                        non_foil_by_rarity_price[rarity].append(card_info)
+                        non_foil_by_rarity_name[rarity].append(card_info)
                 
                 # Add to appropriate list based on foil/non-foil
                 if is_foil:
-                    all_sets_processed_data[set_name]["foil"].append(card_info)
+                    append_foil(card_info)
                 else:
-                    all_sets_processed_data[set_name]["nonFoil"].append(card_info)
+                    append_non_foil(card_info)
             
             processed_count += 1
         
@@ -308,46 +501,20 @@ def generate_card_data_from_tcgplayer(
             logger.info(f"Processed {processed_count} new products for {set_name} (skipped {skipped_count} already existing)")
         else:
             logger.info(f"Processed {processed_count} products for {set_name}")
+        
+        # The set is complete: sort and serialize it now, once
+        finished_set_chunks[set_name] = _finalize_set_data(set_data, rarities)
     
-    # Final sorting after all data is gathered for each set
+    # Sets that weren't processed this run (filtered out or skipped) still get sorted and serialized
     logger.info("Sorting card data...")
-    for set_name in all_sets_processed_data:
-        def sort_by_price(cards):
-            # Sort by TCGplayer market price
-            return sorted(cards, key=lambda x: float(x.get("tcgplayerMarketPrice", "0") or 0), reverse=True)
-        
-        def sort_by_name(cards):
-            # Sort case-insensitively for consistent ordering
-            return sorted(cards, key=lambda x: (x.get("name", "") or "").lower())
-        
-        all_sets_processed_data[set_name]["nonFoil"] = sort_by_price(all_sets_processed_data[set_name]["nonFoil"])
-        all_sets_processed_data[set_name]["nonFoilByName"] = sort_by_name(all_sets_processed_data[set_name]["nonFoil"])
-        
-        all_sets_processed_data[set_name]["foil"] = sort_by_price(all_sets_processed_data[set_name]["foil"])
-        all_sets_processed_data[set_name]["foilByName"] = sort_by_name(all_sets_processed_data[set_name]["foil"])
-        
-        all_sets_processed_data[set_name]["sealed"] = sort_by_price(all_sets_processed_data[set_name]["sealed"])
-        all_sets_processed_data[set_name]["sealedByName"] = sort_by_name(all_sets_processed_data[set_name]["sealed"])
-        
-        all_sets_processed_data[set_name]["preconstructed"] = sort_by_price(all_sets_processed_data[set_name]["preconstructed"])
-        all_sets_processed_data[set_name]["preconstructedByName"] = sort_by_name(all_sets_processed_data[set_name]["preconstructed"])
-        
-        for rarity_key in rarities:
-            all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity_key] = sort_by_price(
-                all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity_key]
-            )
-            all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity_key] = sort_by_name(
-                all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity_key]
-            )
-            
-            all_sets_processed_data[set_name]["foilByRarityPrice"][rarity_key] = sort_by_price(
-                all_sets_processed_data[set_name]["foilByRarityPrice"][rarity_key]
-            )
-            all_sets_processed_data[set_name]["foilByRarityName"][rarity_key] = sort_by_name(
-                all_sets_processed_data[set_name]["foilByRarityName"][rarity_key]
-            )
+    set_chunks = {
+        set_name: finished_set_chunks.get(set_name) or _finalize_set_data(set_data, rarities)
+        for set_name, set_data in all_sets_processed_data.items()
+    }
     
-    # Final save with sorted data
-    _save_card_data_intermediate(all_sets_processed_data, output_file_path)
+    # Final save, splicing together the per-set chunks
+    if not _save_card_data_intermediate(set_chunks, output_file_path):
+        return False
     logger.info(f"Final save complete. Card data saved to {output_file_path}")
+    return True
 
@@ -4,9 +4,11 @@ Fetches product details from TCGplayer catalog API using group IDs and creates J
 This is a generic version that accepts game configuration.
 """
 
-import json
 import os
 import sys
+import time
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Set
 
 # Add parent directory to path for imports
@@ -17,6 +19,61 @@ sys.path.insert(0, core_dir)
 from core.python.pricing_pipeline.tcgplayer_api import get_bearer_token, fetch_product_details, fetch_group_pricing
 from core.python.shared.shared_logger import logger
 
+# Sets whose product info is fetched concurrently (each set makes its own sequence of requests)
+PRODUCT_INFO_MAX_WORKERS = 4
+
+
+def get_product_info_file_path(set_name: str, output_dir: str = "card-data/product-info") -> str:
+    """
+    Get the product info file path for a set.
+    
+    Args:
+        set_name: Name of the set
+        output_dir: Directory containing product info files (default: card-data/product-info)
+        
+    Returns:
+        Path to the set's product info JSON file
+    """
+    safe_set_name = set_name.replace(" ", "_").replace("/", "_")
+    return os.path.join(output_dir, f"product_info_{safe_set_name}.json")
+
+
+def _is_product_info_file_fresh(output_file: str, max_age_hours: float = None) -> bool:
+    """
+    Check whether a product info file exists and, with a max age, was written within it.
+    
+    Args:
+        output_file: Path of the set's product info JSON file
+        max_age_hours: Age in hours after which the file is stale (default: never stale)
+        
+    Returns:
+        True if the file can be used as is, False if it needs (re)generating
+    """
+    try:
+        modified_time = os.stat(output_file).st_mtime
+    except FileNotFoundError:
+        return False
+    return max_age_hours is None or time.time() - modified_time <= max_age_hours * 3600
+
+
+def all_product_info_files_fresh(set_names, output_dir: str = "card-data/product-info",
+                                 max_age_hours: float = None) -> bool:
+    """
+    Check whether product info files exist, and are fresh, for all of the given sets.
+    
+    Args:
+        set_names: Iterable of set names
+        output_dir: Directory containing product info files (default: card-data/product-info)
+        max_age_hours: Age in hours after which a file is stale (default: never stale)
+        
+    Returns:
+        True if every set has a fresh product info file, False otherwise
+    """
+    return all(
+        _is_product_info_file_fresh(get_product_info_file_path(set_name, output_dir), max_age_hours)
+        for set_name in set_names
+    )
+
 
 def collect_product_ids_from_group_pricing(group_id: int, product_type_id: int, bearer_token: str) -> Set[int]:
     """
@@ -131,20 +188,82 @@ def fetch_products_in_batches(product_ids: List[int], bearer_token: str, batch_s
     return product_map
 
 
+def _generate_set_product_info(
+    set_name: str,
+    group_id: int,
+    product_type_id: int,
+    bearer_token: str,
+    rarity_normalizer: Dict[str, str],
+    output_file: str
+):
+    """
+    Fetch product info for one set and save it to its JSON file.
+    
+    Args:
+        set_name: Name of the set
+        group_id: TCGplayer group ID of the set
+        product_type_id: TCGplayer product type ID
+        bearer_token: Bearer token for API authentication
+        rarity_normalizer: Dictionary mapping lowercase rarity values to normalized rarity names
+        output_file: Path of the set's product info JSON file
+    """
+    logger.info(f"Processing set: {set_name} (Group ID: {group_id})")
+    
+    # Collect product IDs from pricing data
+    product_ids_set = collect_product_ids_from_group_pricing(
+        group_id, product_type_id, bearer_token
+    )
+    
+    if not product_ids_set:
+        logger.warning(f"No product IDs found for {set_name}, skipping...")
+        return
+    
+    logger.info(f"Total unique product IDs for {set_name}: {len(product_ids_set)}")
+    
+    # Convert set to list for batch processing
+    product_ids_list = list(product_ids_set)
+    
+    # Fetch product details in batches
+    product_map = fetch_products_in_batches(product_ids_list, bearer_token, rarity_normalizer=rarity_normalizer)
+    
+    if not product_map:
+        logger.error(f"No product data retrieved for {set_name}")
+        return
+    
+    # Create product info array (sorted by product ID for consistency)
+    product_info_list = []
+    for product_id in sorted(product_ids_list):
+        if product_id in product_map:
+            product_info_list.append(product_map[product_id])
+        else:
+            logger.warning(f"Product ID {product_id} not found in API response")
+    
+    # Save to JSON file
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(product_info_list, option=orjson.OPT_INDENT_2))
+    
+    logger.info(f"✓ Saved {len(product_info_list)} products to {output_file}")
+
+
 def generate_product_info_files(
     set_group_ids: Dict[str, int],
     product_type_id: int,
     rarity_normalizer: Dict[str, str],
-    output_dir: str = "card-data/product-info"
+    output_dir: str = "card-data/product-info",
+    max_workers: int = PRODUCT_INFO_MAX_WORKERS,
+    max_age_hours: float = None
 ):
     """
     Generate product info JSON files per set from TCGplayer catalog API using group IDs.
+    Sets without a fresh product info file are fetched concurrently.
     
     Args:
         set_group_ids: Dictionary mapping set name -> group ID
         product_type_id: TCGplayer product type ID
         rarity_normalizer: Dictionary mapping lowercase rarity values to normalized rarity names
         output_dir: Directory to save product info JSON files (default: card-data/product-info)
+        max_workers: Maximum number of sets fetched at once
+        max_age_hours: Age in hours after which an existing file is refetched (default: never)
     """
     logger.info("Starting TCGplayer product info generation using group IDs...")
     logger.info(f"Processing {len(set_group_ids)} sets")
@@ -158,57 +277,33 @@ def generate_product_info_files(
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Process each set
+    # Only sets without a fresh product info file need fetching
+    missing_sets = {}
     for set_name, group_id in set_group_ids.items():
-        logger.info("=" * 60)
-        logger.info(f"Processing set: {set_name} (Group ID: {group_id})")
-        logger.info("=" * 60)
-        
-        # Check if product info file already exists
-        safe_set_name = set_name.replace(" ", "_").replace("/", "_")
-        output_file = os.path.join(output_dir, f"product_info_{safe_set_name}.json")
-        
-        if os.path.exists(output_file):
+        output_file = get_product_info_file_path(set_name, output_dir)
+        if _is_product_info_file_fresh(output_file, max_age_hours):
             logger.info(f"✓ Product info file already exists: {output_file}")
             logger.info(f"Skipping generation (product info doesn't change frequently)")
-            continue
-        
-        # Collect product IDs from pricing data
-        product_ids_set = collect_product_ids_from_group_pricing(
-            group_id, product_type_id, bearer_token
-        )
-        
-        if not product_ids_set:
-            logger.warning(f"No product IDs found for {set_name}, skipping...")
-            continue
-        
-        logger.info(f"Total unique product IDs: {len(product_ids_set)}")
-        
-        # Convert set to list for batch processing
-        product_ids_list = list(product_ids_set)
-        
-        # Fetch product details in batches
-        product_map = fetch_products_in_batches(product_ids_list, bearer_token, rarity_normalizer=rarity_normalizer)
-        
-        if not product_map:
-            logger.error(f"No product data retrieved for {set_name}")
-            continue
-        
-        # Create product info array (sorted by product ID for consistency)
-        product_info_list = []
-        for product_id in sorted(product_ids_list):
-            if product_id in product_map:
-                product_info_list.append(product_map[product_id])
-            else:
-                logger.warning(f"Product ID {product_id} not found in API response")
-        
-        # Save to JSON file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(product_info_list, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"✓ Saved {len(product_info_list)} products to {output_file}")
+        else:
+            if os.path.exists(output_file):
+                logger.info(f"Product info file is older than {max_age_hours} hours, refreshing: {output_file}")
+            missing_sets[set_name] = (group_id, output_file)
+    
+    if missing_sets:
+        logger.info("=" * 60)
+        logger.info(f"Fetching product info for {len(missing_sets)} set(s)")
+        logger.info("=" * 60)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing_sets))) as executor:
+            futures = [
+                executor.submit(
+                    _generate_set_product_info,
+                    set_name, group_id, product_type_id, bearer_token, rarity_normalizer, output_file
+                )
+                for set_name, (group_id, output_file) in missing_sets.items()
+            ]
+            for future in as_completed(futures):
+                future.result()
     
     logger.info("=" * 60)
     logger.info("Product info generation complete!")
     logger.info("=" * 60)
-
@@ -5,7 +5,12 @@ Handles bearer token management and API requests.
 
 import os
 import json
+import tempfile
+import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import sys
@@ -38,6 +43,27 @@ PRIVATE_KEY = os.getenv("TCGPLAYER_API_PRIVATE_KEY")
 _repo_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
 TOKEN_FILE = os.path.join(_repo_root, "tcgplayer_token.json")
 
+# Group pricing response cache - prices change at most daily, so re-runs on the same day
+# reuse the cached responses instead of re-fetching every group
+PRICING_CACHE_DIR = os.path.join(_repo_root, "tcgplayer_cache")
+PRICING_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Tokens expiring within this many seconds are refreshed
+TOKEN_REFRESH_MARGIN_SECONDS = 5 * 60
+
+# Shared HTTP session: keeps connections alive across requests (one TLS handshake per host)
+# and retries transient failures with backoff
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset(["GET", "POST"]))
+))
+
+# (connect, read) timeout in seconds for TCGplayer requests, so a hung connection can't stall a run
+REQUEST_TIMEOUT = (3.05, 30)
+
 
 def get_bearer_token(force_refresh=False, token_file_path=None):
     """
@@ -60,18 +86,29 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
     # Check if token file exists and is still valid
     if not force_refresh and os.path.exists(token_file):
         try:
-            with open(token_file, 'r') as f:
-                token_info = json.load(f)
+            with open(token_file, 'rb') as f:
+                token_info = orjson.loads(f.read())
             
+            # Expiry as epoch seconds (compared directly, no date parsing); token files
+            # written before this field existed fall back to parsing "expires_at"
+            expires_at_epoch = token_info.get("expires_at_epoch")
             expires_at_value = token_info.get("expires_at", "")
-            if expires_at_value:
+            if isinstance(expires_at_epoch, (int, float)):
+                time_until_expiry = expires_at_epoch - time.time()
+                expires_at_display = expires_at_value or expires_at_epoch
+                
+                if time_until_expiry > TOKEN_REFRESH_MARGIN_SECONDS:
+                    logger.info(f"Using existing TCGplayer bearer token (expires in {time_until_expiry / 60:.1f} minutes, at {expires_at_display}).")
+                    return token_info.get("access_token")
+                elif time_until_expiry > 0:
+                    logger.info(f"Token expires soon (in {time_until_expiry/60:.1f} minutes, at {expires_at_display}), refreshing...")
+                else:
+                    logger.info(f"Token has expired ({abs(time_until_expiry)/60:.1f} minutes ago, was {expires_at_display}), refreshing...")
+            elif expires_at_value:
                 # Handle both string ISO format and numeric timestamp
                 if isinstance(expires_at_value, str):
-                    # Parse ISO format, handling 'Z' as UTC
-                    if expires_at_value.endswith('Z'):
-                        expires_at = datetime.fromisoformat(expires_at_value.replace('Z', '+00:00'))
-                    else:
-                        expires_at = datetime.fromisoformat(expires_at_value)
+                    # Parse ISO format (fromisoformat reads a trailing 'Z' as UTC on Python 3.11+)
+                    expires_at = datetime.fromisoformat(expires_at_value)
                 else:
                     # Assume it's a timestamp
                     expires_at = datetime.fromtimestamp(expires_at_value, tz=timezone.utc)
@@ -84,7 +121,7 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
                 time_until_expiry = (expires_at - now).total_seconds()
                 
                 # Check if token expires more than 5 minutes from now
-                if expires_at > now + timedelta(minutes=5):
+                if expires_at > now + timedelta(seconds=TOKEN_REFRESH_MARGIN_SECONDS):
                     minutes_remaining = time_until_expiry / 60
                     logger.info(f"Using existing TCGplayer bearer token (expires in {minutes_remaining:.1f} minutes, at {expires_at.isoformat()}).")
                     return token_info.get("access_token")
@@ -110,10 +147,10 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
     }
     
     try:
-        response = requests.post(TCGPLAYER_TOKEN_URL, data=data, headers=headers)
+        response = _session.post(TCGPLAYER_TOKEN_URL, data=data, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        token_data = response.json()
+        token_data = orjson.loads(response.content)
         bearer_token = token_data.get("access_token")
         
         if bearer_token:
@@ -127,6 +164,7 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
                 "token_type": token_data.get("token_type", "bearer"),
                 "expires_in": expires_in,
                 "expires_at": expires_at.isoformat(),
+                "expires_at_epoch": expires_at.timestamp(),
                 "userName": token_data.get("userName", PUBLIC_KEY),
                 ".issued": token_data.get(".issued", ""),
                 ".expires": token_data.get(".expires", "")
@@ -149,7 +187,7 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
             logger.error(f"Response: {token_data}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Failed to obtain bearer token: {e}")
         if hasattr(e, 'response') and e.response is not None:
             logger.error(f"Response status: {e.response.status_code}")
@@ -157,18 +195,78 @@ def get_bearer_token(force_refresh=False, token_file_path=None):
         return None
 
 
-def fetch_group_pricing(group_id: int, product_type_id: int = 128, bearer_token: str = None):
+def _get_group_pricing_cache_path(group_id: int, product_type_id: int) -> str:
+    """Get the cache file path for a group's pricing response (one file per group, freshness is its mtime)."""
+    return os.path.join(PRICING_CACHE_DIR, f"group_{group_id}_{product_type_id}.json")
+
+
+def _load_group_pricing_cache_entry(cache_path: str):
+    """
+    Load a group's cache entry ({"etag", "last_modified", "data"}), else None.
+    The entry's validators are used to revalidate it once it's older than the TTL.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            entry = orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Could not read pricing cache {cache_path}, will re-fetch: {e}")
+        return None
+    if not isinstance(entry, dict) or "data" not in entry:
+        return None
+    return entry
+
+
+def _is_group_pricing_cache_fresh(cache_path: str, cache_ttl_seconds: int) -> bool:
+    """Whether a group's cache file was written (or revalidated) within the TTL."""
+    try:
+        return time.time() - os.path.getmtime(cache_path) < cache_ttl_seconds
+    except OSError:
+        return False
+
+
+def _save_cached_group_pricing(cache_path: str, entry: dict):
+    """Write a group's cache entry (temp file + rename, so readers never see a partial file)."""
+    try:
+        os.makedirs(PRICING_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=PRICING_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(entry))
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write pricing cache {cache_path}: {e}")
+
+
+def fetch_group_pricing(
+    group_id: int,
+    product_type_id: int = 128,
+    bearer_token: str = None,
+    cache_ttl_seconds: int = PRICING_CACHE_TTL_SECONDS
+):
     """
     Fetch pricing data for a group (set) from TCGplayer API.
+    Successful responses are cached on disk per group for cache_ttl_seconds.
     
     Args:
         group_id: The group ID (set ID) to fetch pricing for
         product_type_id: Product type ID (default: 128 for Trading Cards)
         bearer_token: Optional bearer token. If not provided, will get one automatically.
+        cache_ttl_seconds: How long a cached response stays valid (0 or None disables the cache)
         
     Returns:
         Dictionary with API response data, or None if failed
     """
+    cache_path = _get_group_pricing_cache_path(group_id, product_type_id) if cache_ttl_seconds else None
+    cache_entry = _load_group_pricing_cache_entry(cache_path) if cache_path else None
+    if cache_entry is not None and _is_group_pricing_cache_fresh(cache_path, cache_ttl_seconds):
+        logger.info(f"Using cached pricing data for group {group_id}")
+        return cache_entry["data"]
+    
     if bearer_token is None:
         bearer_token = get_bearer_token()
         if not bearer_token:
@@ -184,14 +282,37 @@ def fetch_group_pricing(group_id: int, product_type_id: int = 128, bearer_token:
         "Authorization": f"Bearer {bearer_token}"
     }
     
+    # Once the cache entry expires, revalidate it with a conditional GET; an unchanged
+    # group comes back as an empty 304 instead of the full payload
+    if cache_entry is not None:
+        if cache_entry.get("etag"):
+            headers["If-None-Match"] = cache_entry["etag"]
+        if cache_entry.get("last_modified"):
+            headers["If-Modified-Since"] = cache_entry["last_modified"]
+    
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = _session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        data = response.json()
+        if response.status_code == 304 and cache_entry is not None:
+            logger.info(f"Pricing data for group {group_id} not modified, reusing cached response")
+            # Restart the entry's TTL without rewriting the body
+            try:
+                os.utime(cache_path)
+            except OSError as e:
+                logger.warning(f"Could not refresh pricing cache {cache_path}: {e}")
+            return cache_entry["data"]
+        
+        data = orjson.loads(response.content)
         
         # Check if response indicates success
         if data.get("success", False):
+            if cache_path:
+                _save_cached_group_pricing(cache_path, {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "data": data
+                })
             return data
         else:
             errors = data.get("errors", [])
@@ -202,7 +323,7 @@ def fetch_group_pricing(group_id: int, product_type_id: int = 128, bearer_token:
                 logger.error(f"Response: {data}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Failed to fetch pricing for group {group_id}: {e}")
         if hasattr(e, 'response') and e.response is not None:
             logger.error(f"Response status: {e.response.status_code}")
@@ -237,10 +358,10 @@ def fetch_product_pricing(product_ids: list, bearer_token: str = None):
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = _session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Check if response indicates success
         if data.get("success", False):
@@ -252,7 +373,7 @@ def fetch_product_pricing(product_ids: list, bearer_token: str = None):
                 logger.error(f"Errors: {errors}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Failed to fetch pricing for products: {e}")
         if hasattr(e, 'response') and e.response is not None:
             logger.error(f"Response status: {e.response.status_code}")
@@ -292,10 +413,10 @@ def fetch_product_details(product_ids: list, bearer_token: str = None):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = _session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Check if response indicates success
         if data.get("success", False):
@@ -307,7 +428,7 @@ def fetch_product_details(product_ids: list, bearer_token: str = None):
                 logger.error(f"Errors: {errors}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Failed to fetch product details: {e}")
         if hasattr(e, 'response') and e.response is not None:
             logger.error(f"Response status: {e.response.status_code}")
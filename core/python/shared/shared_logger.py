@@ -1,22 +1,106 @@
 """
 Shared logger module for consistent timestamped logging across all scripts.
 All components should use this logger instead of print() statements.
+The default `logger` is a plain logging.Logger whose handlers are attached when it first logs.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime
-from pathlib import Path
 
+# Format: [YYYY-MM-DD HH:MM:SS] message
+# (asctime is rendered by logging from the record's creation time)
+LOG_FORMAT = "[%(asctime)s] %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-class TimestampFormatter(logging.Formatter):
-    """Custom formatter that uses [YYYY-MM-DD HH:MM:SS] format for timestamps."""
+# Log files are written through a 64KB buffer instead of one write per record
+LOG_FILE_BUFFER_SIZE = 65536
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that lets writes accumulate in a large buffer.
+    The buffer is flushed immediately for ERROR and above, whenever its queue
+    listener goes idle, and on close.
+    """
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener that flushes its handlers once the queue is drained, so a burst of
+    records is written in one go but nothing waits in the buffer while the app is idle
+    (a killed process only loses the records still in flight).
+    """
     
-    def format(self, record):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Format: [YYYY-MM-DD HH:MM:SS] message
-        return f"[{timestamp}] {record.getMessage()}"
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+# Log directories already created, loggers already set up by (name, log_file_path), and
+# the queue handler feeding each log file's listener (one listener thread per file, shared
+# by every logger writing to it), so repeated setup_logger calls skip the makedirs
+# syscalls and handler inspection
+_ensured_dirs = set()
+_configured_loggers = {}
+_file_queue_handlers = {}
+
+
+def _get_file_queue_handler(log_file_path: str, formatter: logging.Formatter) -> logging.Handler:
+    """
+    Get the queue handler for a log file, starting the file's listener on first use.
+    
+    Args:
+        log_file_path: Path to the log file
+        formatter: Formatter for the file's records
+        
+    Returns:
+        QueueHandler that hands records to the file's listener thread
+    """
+    file_key = os.path.abspath(log_file_path)
+    queue_handler = _file_queue_handlers.get(file_key)
+    if queue_handler is not None:
+        return queue_handler
+    
+    # Ensure log directory exists
+    log_dir = os.path.dirname(file_key)
+    if log_dir not in _ensured_dirs:
+        os.makedirs(log_dir, exist_ok=True)
+        _ensured_dirs.add(log_dir)
+    
+    file_handler = BufferedFileHandler(log_file_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    
+    # File I/O happens on a background listener thread; the caller only enqueues.
+    # Stopping the listener at exit drains the queue before logging shuts down
+    # and flushes the file
+    log_queue = queue.SimpleQueue()
+    listener = _FlushingQueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    _file_queue_handlers[file_key] = queue_handler
+    return queue_handler
 
 
 def setup_logger(name: str = None, log_file_path: str = None) -> logging.Logger:
@@ -31,35 +115,76 @@ def setup_logger(name: str = None, log_file_path: str = None) -> logging.Logger:
     Returns:
         Configured logger instance
     """
+    cached_logger = _configured_loggers.get((name, log_file_path))
+    if cached_logger is not None:
+        return cached_logger
+    
     logger = logging.getLogger(name)
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    
+    # The default logger's placeholder handler isn't configuration; it is swapped out here
+    # (as a new list, so a thread already looping over the old one doesn't also reach the
+    # handlers added below) and the log file it was created with is still attached
+    deferred_handlers = [h for h in logger.handlers if isinstance(h, _DeferredSetupHandler)]
+    if deferred_handlers:
+        logger.handlers = [h for h in logger.handlers if not isinstance(h, _DeferredSetupHandler)]
     
-    # Only configure if not already configured
+    # Only configure if this logger has no handlers of its own (handlers on ancestors such as
+    # the root logger don't count, since propagation is turned off here)
     if not logger.handlers:
         # Always add console handler (stdout)
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(TimestampFormatter())
+        console_handler.setFormatter(formatter)
         logger.addHandler(console_handler)
         
-        # Add file handler if log file path is provided
-        if log_file_path:
-            # Ensure log directory exists
-            log_dir = os.path.dirname(log_file_path)
-            if log_dir:
-                os.makedirs(log_dir, exist_ok=True)
-            
-            file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-            file_handler.setFormatter(TimestampFormatter())
-            logger.addHandler(file_handler)
-        
         logger.setLevel(logging.INFO)
         # Prevent propagation to root logger to avoid duplicate messages
         logger.propagate = False
     
+    # Add file handler if log file path is provided (also when the logger was already
+    # configured without it, so the requested file is never silently dropped)
+    for file_path in (log_file_path, *(h.log_file_path for h in deferred_handlers)):
+        if file_path:
+            queue_handler = _get_file_queue_handler(file_path, formatter)
+            if queue_handler not in logger.handlers:
+                logger.addHandler(queue_handler)
+    
+    _configured_loggers[(name, log_file_path)] = logger
     return logger
 
 
-# Create a default logger instance for convenience
-logger = setup_logger("card_game_pricing")
+# Environment variable that scripts can set before importing this module to have the
+# default logger write to a file from the start (no reconfiguration needed later)
+LOG_FILE_ENV_VAR = "CARD_GAME_PRICING_LOG_FILE"
+
+DEFAULT_LOGGER_NAME = "card_game_pricing"
+
+
+class _DeferredSetupHandler(logging.Handler):
+    """
+    Placeholder handler on the default logger until its first record: setup_logger
+    replaces it with the real console/file handlers, which then get the record.
+    """
+    
+    def __init__(self, log_file_path: str = None):
+        super().__init__()
+        self.log_file_path = log_file_path
+    
+    def emit(self, record):
+        logger = logging.getLogger(DEFAULT_LOGGER_NAME)
+        # Another thread (or a setup_logger call) may have set the logger up already
+        if self in logger.handlers:
+            setup_logger(DEFAULT_LOGGER_NAME, log_file_path=self.log_file_path)
+        logger.callHandlers(record)
+
+
+# Default logger instance for convenience. It is a real logging.Logger, but only gets a
+# placeholder handler here; the console/file handlers are built when it first emits
+logger = logging.getLogger(DEFAULT_LOGGER_NAME)
+if not logger.handlers:
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(_DeferredSetupHandler(os.getenv(LOG_FILE_ENV_VAR) or None))
 
 
 def log(message: str):
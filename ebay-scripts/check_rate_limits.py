@@ -1,13 +1,18 @@
 import requests
-import json
+import orjson
 import os
+import sys
 from datetime import datetime
+from functools import lru_cache
 from config import (
     EBAY_SANDBOX_ENV,
     EBAY_ANALYTICS_API_ENDPOINT,
     EBAY_ANALYTICS_API_SANDBOX_ENDPOINT,
 )
-from batch_update import get_or_refresh_access_token
+from ebay_auth import SESSION, REQUEST_TIMEOUT, get_or_refresh_access_token
+
+# Analytics API endpoint for the configured environment
+ANALYTICS_API_ENDPOINT = EBAY_ANALYTICS_API_SANDBOX_ENDPOINT if EBAY_SANDBOX_ENV else EBAY_ANALYTICS_API_ENDPOINT
 
 
 def get_rate_limits(access_token: str = None, api_name: str = None, api_context: str = None):
@@ -27,11 +32,6 @@ def get_rate_limits(access_token: str = None, api_name: str = None, api_context:
         if not access_token:
             return None
     
-    if EBAY_SANDBOX_ENV:
-        endpoint = EBAY_ANALYTICS_API_SANDBOX_ENDPOINT
-    else:
-        endpoint = EBAY_ANALYTICS_API_ENDPOINT
-    
     params = {}
     if api_name:
         params["api_name"] = api_name
@@ -44,7 +44,8 @@ def get_rate_limits(access_token: str = None, api_name: str = None, api_context:
     }
     
     try:
-        response = requests.get(endpoint, headers=headers, params=params)
+        # Shared eBay session: the token request and this call reuse one keep-alive connection
+        response = SESSION.get(ANALYTICS_API_ENDPOINT, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException:
@@ -53,19 +54,28 @@ def get_rate_limits(access_token: str = None, api_name: str = None, api_context:
         return None
 
 
+# Time window units, largest first (windows under a minute are shown in plain seconds)
+_TIME_WINDOW_UNITS = ((86400, "day"), (3600, "hour"), (60, "minute"))
+
+
+@lru_cache(maxsize=16)
 def format_time_window(seconds: int) -> str:
     """Convert seconds to human-readable time format."""
-    if seconds < 60:
-        return f"{seconds} seconds"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        return f"{minutes} minute{'s' if minutes != 1 else ''}"
-    elif seconds < 86400:
-        hours = seconds // 3600
-        return f"{hours} hour{'s' if hours != 1 else ''}"
-    else:
-        days = seconds // 86400
-        return f"{days} day{'s' if days != 1 else ''}"
+    for unit_seconds, unit_name in _TIME_WINDOW_UNITS:
+        if seconds >= unit_seconds:
+            count = seconds // unit_seconds
+            return f"{count} {unit_name}{'s' if count != 1 else ''}"
+    return f"{seconds} seconds"
+
+
+@lru_cache(maxsize=64)
+def _format_reset_time(reset: str) -> str:
+    """Format an ISO reset timestamp as UTC, or return it unchanged if it doesn't parse."""
+    try:
+        reset_dt = datetime.fromisoformat(reset.replace('Z', '+00:00'))
+        return reset_dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+    except (ValueError, TypeError, AttributeError):
+        return reset
 
 
 def print_rate_limits(rate_limits_data: dict):
@@ -80,25 +90,27 @@ def print_rate_limits(rate_limits_data: dict):
         print("No rate limits found.")
         return
     
-    print(f"\n{'='*80}")
-    print("eBay API Rate Limits")
-    print(f"{'='*80}")
-    print(f"Environment: {'SANDBOX' if EBAY_SANDBOX_ENV else 'PRODUCTION'}")
-    print(f"Total APIs: {len(rate_limits)}")
-    print(f"{'='*80}\n")
+    # The report is collected and written to stdout in one call
+    out = [
+        f"\n{'='*80}\n",
+        "eBay API Rate Limits\n",
+        f"{'='*80}\n",
+        f"Environment: {'SANDBOX' if EBAY_SANDBOX_ENV else 'PRODUCTION'}\n",
+        f"Total APIs: {len(rate_limits)}\n",
+        f"{'='*80}\n\n",
+    ]
     
     for api_info in rate_limits:
         api_context = api_info.get("apiContext", "N/A")
         api_name = api_info.get("apiName", "N/A")
         api_version = api_info.get("apiVersion", "N/A")
         
-        print(f"API: {api_name} ({api_context}) - Version: {api_version}")
-        print("-" * 80)
+        out.append(f"API: {api_name} ({api_context}) - Version: {api_version}\n")
+        out.append("-" * 80 + "\n")
         
         resources = api_info.get("resources", [])
         if not resources:
-            print("  No resources found.")
-            print()
+            out.append("  No resources found.\n\n")
             continue
         
         for resource in resources:
@@ -106,12 +118,11 @@ def print_rate_limits(rate_limits_data: dict):
             rates = resource.get("rates", [])
             
             if not rates:
-                print(f"  Resource: {resource_name}")
-                print("    No rate limit data available.")
-                print()
+                out.append(f"  Resource: {resource_name}\n")
+                out.append("    No rate limit data available.\n\n")
                 continue
             
-            print(f"  Resource: {resource_name}")
+            out.append(f"  Resource: {resource_name}\n")
             
             for rate in rates:
                 count = rate.get("count", 0)
@@ -125,33 +136,37 @@ def print_rate_limits(rate_limits_data: dict):
                 else:
                     percentage = 0
                 
+                # Resources usually share time windows and reset times, so both formatters are cached
                 reset_time_str = "N/A"
                 if reset != "N/A":
-                    try:
-                        reset_dt = datetime.fromisoformat(reset.replace('Z', '+00:00'))
-                        reset_time_str = reset_dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    except:
-                        reset_time_str = reset
+                    reset_time_str = _format_reset_time(reset)
                 
-                print(f"    Calls Made: {count:,} / {limit:,} ({percentage:.1f}% used)")
-                print(f"    Remaining: {remaining:,}")
-                print(f"    Time Window: {format_time_window(time_window)}")
-                print(f"    Reset Time: {reset_time_str}")
+                out.append(f"    Calls Made: {count:,} / {limit:,} ({percentage:.1f}% used)\n")
+                out.append(f"    Remaining: {remaining:,}\n")
+                out.append(f"    Time Window: {format_time_window(time_window)}\n")
+                out.append(f"    Reset Time: {reset_time_str}\n")
                 
                 if percentage >= 90:
-                    print(f"    [WARNING] {percentage:.1f}% of rate limit used!")
+                    out.append(f"    [WARNING] {percentage:.1f}% of rate limit used!\n")
                 elif percentage >= 75:
-                    print(f"    [CAUTION] {percentage:.1f}% of rate limit used")
+                    out.append(f"    [CAUTION] {percentage:.1f}% of rate limit used\n")
                 
-                print()
+                out.append("\n")
         
-        print()
+        out.append("\n")
+    
+    sys.stdout.write("".join(out))
+
+
+def write_rate_limits_json(rate_limits_data: dict):
+    """Write the raw rate limit data to stdout as one line of JSON (for scripts and CI)."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(rate_limits_data, option=orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.buffer.flush()
 
 
 def main():
     """Main function to check and display rate limits."""
-    import sys
-    
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     if os.path.basename(script_dir) == "scripts":
@@ -159,6 +174,8 @@ def main():
     
     api_name = None
     api_context = None
+    # The formatted report is for terminals; redirected output gets JSON unless text is requested
+    output_format = "text" if sys.stdout.isatty() else "json"
     
     if len(sys.argv) > 1:
         for arg in sys.argv[1:]:
@@ -166,21 +183,28 @@ def main():
                 api_name = arg.split("=", 1)[1]
             elif arg.startswith("--api-context="):
                 api_context = arg.split("=", 1)[1]
+            elif arg.startswith("--format="):
+                output_format = arg.split("=", 1)[1]
             elif arg == "--help" or arg == "-h":
-                print("Usage: python check_rate_limits.py [--api-name=NAME] [--api-context=CONTEXT]")
+                print("Usage: python check_rate_limits.py [--api-name=NAME] [--api-context=CONTEXT] [--format=text|json]")
                 print("\nOptions:")
                 print("  --api-name=NAME      Filter by API name (e.g., 'browse', 'inventory', 'tradingapi')")
                 print("  --api-context=CONTEXT Filter by API context (e.g., 'buy', 'sell', 'commerce', 'tradingapi')")
+                print("  --format=FORMAT      Output 'text' or 'json' (default: text on a terminal, json when redirected)")
                 print("\nExamples:")
                 print("  python check_rate_limits.py")
                 print("  python check_rate_limits.py --api-name=browse")
                 print("  python check_rate_limits.py --api-context=buy")
+                print("  python check_rate_limits.py --format=text > rate_limits.txt")
                 return
     
     rate_limits_data = get_rate_limits(api_name=api_name, api_context=api_context)
     
     if rate_limits_data:
-        print_rate_limits(rate_limits_data)
+        if output_format == "json":
+            write_rate_limits_json(rate_limits_data)
+        else:
+            print_rate_limits(rate_limits_data)
 
 
 if __name__ == "__main__":
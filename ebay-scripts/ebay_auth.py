@@ -1,7 +1,12 @@
 import requests
 import base64
-import json
+import logging
+import orjson
 import os
+import time
+from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import (
     EBAY_CLIENT_ID,
     EBAY_CERT_ID,
@@ -10,7 +15,39 @@ from config import (
     EBAY_OAUTH_TOKEN_PRODUCTION_URL,
 )
 
+logger = logging.getLogger(__name__)
+
+# Shared HTTP session for every HTTP call in the eBay scripts: keeps connections alive
+# between requests (one TLS handshake per host) and retries transient server errors with
+# backoff. 429s are returned to the caller, since ebay_parser's rate limiter backs off
+# using eBay's X-RateLimit-Reset header
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=frozenset(["GET", "POST"]))
+))
+
+# (connect, read) timeout in seconds for the eBay scripts' requests, so a hung connection
+# can't stall a run (the read timeout is per socket read, so large responses are fine)
+REQUEST_TIMEOUT = (3.05, 30)
+
+# Token file shared by the eBay scripts (relative to the working directory)
+TOKEN_FILE = "ebay_token.json"
+
+# Refresh the cached token this many seconds before it actually expires
+TOKEN_EXPIRY_SKEW_SECONDS = 60
+
+# Token from the last successful request in this process; expires_at is on the time.monotonic() clock
+_token_cache = {"access_token": None, "expires_at": 0.0}
+
 def get_application_access_token():
+    # Reuse the cached token until it is about to expire (eBay tokens last ~2 hours)
+    now = time.monotonic()
+    if _token_cache["access_token"] and now < _token_cache["expires_at"] - TOKEN_EXPIRY_SKEW_SECONDS:
+        return {"access_token": _token_cache["access_token"], "expires_in": int(_token_cache["expires_at"] - now)}
+
     if EBAY_SANDBOX_ENV:
         token_url = EBAY_OAUTH_TOKEN_SANDBOX_URL
     else:
@@ -31,26 +68,93 @@ def get_application_access_token():
     }
 
     try:
-        response = requests.post(token_url, headers=headers, data=data)
+        response = SESSION.post(token_url, headers=headers, data=data, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # Raise an exception for HTTP errors
         token_info = response.json()
         access_token = token_info["access_token"]
         expires_in = token_info["expires_in"]
-        print(f"Successfully obtained eBay application access token. Expires in {expires_in} seconds.")
+        _token_cache["access_token"] = access_token
+        _token_cache["expires_at"] = now + expires_in
+        logger.info(f"Successfully obtained eBay application access token. Expires in {expires_in} seconds.")
         return {"access_token": access_token, "expires_in": expires_in}
     except requests.exceptions.RequestException as e:
-        print(f"Error obtaining access token: {e}")
-        if response is not None: # Ensure response object exists before accessing
-            print(f"Status Code: {response.status_code}")
-            print(f"Response: {response.text}")
+        logger.error(f"Error obtaining access token: {e}")
+        if e.response is not None: # Ensure response object exists before accessing
+            logger.error(f"Status Code: {e.response.status_code}")
+            logger.error(f"Response: {e.response.text}")
         return None
 
+def get_or_refresh_access_token():
+    """
+    Get or refresh eBay access token.
+    Checks for cached token first, then gets a new one if needed.
+    """
+    # Check if token file exists and is still valid
+    if os.path.exists(TOKEN_FILE):
+        try:
+            with open(TOKEN_FILE, 'rb') as f:
+                token_info = orjson.loads(f.read())
+            expires_at_value = token_info.get("expires_at", "")
+            if expires_at_value:
+                # Handle both string ISO format and numeric timestamp
+                if isinstance(expires_at_value, str):
+                    # Parse ISO format (fromisoformat reads a trailing 'Z' as UTC on Python 3.11+)
+                    expires_at = datetime.fromisoformat(expires_at_value)
+                else:
+                    # Assume it's a timestamp
+                    expires_at = datetime.fromtimestamp(expires_at_value, tz=timezone.utc)
+                
+                # Ensure both times are timezone-aware for proper comparison
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                
+                now = datetime.now(timezone.utc)
+                time_until_expiry = (expires_at - now).total_seconds()
+                
+                # Check if token expires more than 5 minutes from now
+                if expires_at > now + timedelta(minutes=5):
+                    minutes_remaining = time_until_expiry / 60
+                    logger.info(f"Using existing eBay access token (expires in {minutes_remaining:.1f} minutes).")
+                    return token_info["access_token"]
+                else:
+                    if time_until_expiry > 0:
+                        logger.info(f"Token expires soon (in {time_until_expiry/60:.1f} minutes), refreshing...")
+                    else:
+                        logger.info(f"Token has expired ({abs(time_until_expiry)/60:.1f} minutes ago), refreshing...")
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Error reading token file, will refresh: {e}")
+    
+    # If token doesn't exist or is expired/about to expire, get a new one
+    logger.info("Refreshing eBay access token...")
+    new_token_info = get_application_access_token()
+    if new_token_info:
+        # Store new token with expiry time (subtract 1 minute as safety margin for refresh)
+        now_utc = datetime.now(timezone.utc)
+        expires_at = now_utc + timedelta(seconds=new_token_info["expires_in"]) - timedelta(minutes=1)
+        new_token_info["expires_at"] = expires_at.isoformat()
+        with open(TOKEN_FILE, 'wb') as f:
+            f.write(orjson.dumps(new_token_info, option=orjson.OPT_INDENT_2))
+        # Set secure permissions after writing (Unix/Linux only, safe to ignore on Windows)
+        try:
+            os.chmod(TOKEN_FILE, 0o600)
+        except (OSError, NotImplementedError):
+            # Windows doesn't support Unix-style permissions, which is fine for local dev
+            pass
+        logger.info("New eBay access token obtained and saved.")
+        return new_token_info["access_token"]
+    return None
+
 if __name__ == "__main__":
-    print("Attempting to get eBay application access token...")
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s - %(levelname)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    logger.info("Attempting to get eBay application access token...")
     token_info = get_application_access_token()
     if token_info:
-        print("Successfully obtained access token:")
-        print(token_info["access_token"])
-        print(f"Expires In: {token_info['expires_in']} seconds")
+        logger.info("Successfully obtained access token:")
+        logger.info(token_info["access_token"])
+        logger.info(f"Expires In: {token_info['expires_in']} seconds")
     else:
-        print("Failed to obtain access token.")
+        logger.error("Failed to obtain access token.")
@@ -6,18 +6,26 @@ then filter and aggregate by card to generate card_data.json.
 This reduces API calls from hundreds to just a few calls per set (typically 2 per set).
 """
 
-import json
 import os
+import queue
 import re
+import orjson
 import requests
 import logging
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from itertools import chain
+from operator import attrgetter
+from statistics import median
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from config import EBAY_BUY_API_ENDPOINT
-from ebay_auth import get_application_access_token
+from ebay_auth import get_or_refresh_access_token
 from ebay_parser import (
     _make_rate_limited_request,
-    _wait_for_rate_limit,
+    CONDITION_NONFOIL,
+    CONDITION_FOIL,
     is_foil_item,
     is_graded_card,
     should_exclude_item,
@@ -34,14 +42,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Cache for exchange rates to avoid repeated API calls
-_exchange_rate_cache = {}
+# Exchange rates persisted across runs as {currency: {"rate": r, "fetched_at": iso}}
+# (relative to the working directory); entries older than the TTL are refetched
+EXCHANGE_RATE_CACHE_FILE = "exchange_rates.json"
+EXCHANGE_RATE_CACHE_TTL = timedelta(hours=24)
+
+def _load_exchange_rate_cache() -> Dict[str, dict]:
+    """
+    Load persisted exchange rates, or an empty cache if the file is missing or unreadable.
+    """
+    try:
+        with open(EXCHANGE_RATE_CACHE_FILE, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Error reading exchange rate cache, ignoring it: {e}")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _save_exchange_rate_cache():
+    """
+    Persist the exchange rate cache. Written to a temporary file and renamed into place,
+    so concurrent runs never read a partially written file.
+    """
+    tmp_path = f"{EXCHANGE_RATE_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(_exchange_rate_cache, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, EXCHANGE_RATE_CACHE_FILE)
+    except OSError as e:
+        logger.warning(f"Could not save exchange rate cache: {e}")
+
+# Cache for exchange rates to avoid repeated API calls (within a run and across runs)
+_exchange_rate_cache = _load_exchange_rate_cache()
+
+
+@dataclass(slots=True)
+class EbayCardEntry:
+    """One card's median eBay prices (rounded floats, so entries sort by price)."""
+    name: str
+    price: float  # Market price
+    avgSoldPrice: float
+    avgCurrentPrice: float
+    condition: str
+    rarity: str
+    slug: str
+    set_name: str
+    
+    def to_json(self) -> dict:
+        """The entry's card_data.json object (keys in field order, prices as 2-decimal strings)."""
+        return {
+            "name": self.name,
+            "price": f"{self.price:.2f}",
+            "avgSoldPrice": f"{self.avgSoldPrice:.2f}",
+            "avgCurrentPrice": f"{self.avgCurrentPrice:.2f}",
+            "condition": self.condition,
+            "rarity": self.rarity,
+            "slug": self.slug,
+            "set_name": self.set_name,
+        }
+
+
+def _card_entry_to_json(obj):
+    """orjson default hook: write EbayCardEntry objects with to_json()."""
+    if isinstance(obj, EbayCardEntry):
+        return obj.to_json()
+    raise TypeError
+
+
+# Sort keys for a card entry's (float) market price and name
+_price_sort_key = attrgetter("price")
+_name_sort_key = attrgetter("name")
+
+# Listing queries (sold and current, for every set) fetched concurrently. Request starts
+# stay spaced by the shared rate limiter in ebay_parser, but each request's network
+# latency overlaps with the others'.
+LISTING_FETCH_MAX_WORKERS = 8
+
+# exchangerate-api.com latest rates endpoint (free, no API key needed)
+EXCHANGE_RATE_API_URL = "https://api.exchangerate-api.com/v4/latest/{currency}"
+
+# Set once the all-currencies USD rates have been requested this run (successfully or not)
+_usd_rates_primed = False
+
+def _get_cached_exchange_rate(currency: str) -> Optional[float]:
+    """
+    Return the cached rate for a currency if it's younger than the TTL, otherwise None.
+    """
+    entry = _exchange_rate_cache.get(currency)
+    if not entry:
+        return None
+    try:
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        if fetched_at > datetime.now(timezone.utc) - EXCHANGE_RATE_CACHE_TTL:
+            return entry["rate"]
+    except (KeyError, TypeError, ValueError):
+        # Malformed entry, refetch it
+        pass
+    return None
+
+def _prime_usd_rates():
+    """
+    Fill the exchange rate cache for every currency from a single /latest/USD call.
+    The USD payload gives USD -> foreign rates, so each cached rate is 1 / rate.
+    """
+    global _usd_rates_primed
+    _usd_rates_primed = True
+    try:
+        response = requests.get(EXCHANGE_RATE_API_URL.format(currency="USD"), timeout=5)
+        response.raise_for_status()
+        rates = orjson.loads(response.content).get('rates', {})
+    except Exception as e:
+        logger.warning(f"Error fetching USD exchange rates, falling back to per-currency requests: {e}")
+        return
+    
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    for currency, rate in rates.items():
+        if rate and currency != 'USD':
+            _exchange_rate_cache[currency] = {"rate": 1.0 / rate, "fetched_at": fetched_at}
+    _save_exchange_rate_cache()
 
 def get_exchange_rate_to_usd(currency: str) -> float:
     """
     Get exchange rate from given currency to USD.
     Uses exchangerate-api.com (free, no API key required).
-    Caches rates to avoid repeated API calls.
+    Caches rates for 24 hours (in EXCHANGE_RATE_CACHE_FILE) to avoid repeated API calls.
+    The first cache miss fetches every currency's rate in one request.
     
     Args:
         currency: Currency code (e.g., 'EUR', 'GBP', 'CAD')
@@ -55,21 +182,33 @@ def get_exchange_rate_to_usd(currency: str) -> float:
     currency = currency.upper()
     
     # Check cache first
-    if currency in _exchange_rate_cache:
-        return _exchange_rate_cache[currency]
-    
+    cached_rate = _get_cached_exchange_rate(currency)
+    if cached_rate is not None:
+        return cached_rate
+    
+    # One request covers all currencies; only needed once per run
+    if not _usd_rates_primed:
+        _prime_usd_rates()
+        cached_rate = _get_cached_exchange_rate(currency)
+        if cached_rate is not None:
+            return cached_rate
+    
+    # Fall back to the currency's own endpoint if the bulk call failed or didn't include it
     try:
-        # Use exchangerate-api.com free endpoint (no API key needed)
         # This gets rates from European Central Bank
-        url = f"https://api.exchangerate-api.com/v4/latest/{currency}"
+        url = EXCHANGE_RATE_API_URL.format(currency=currency)
         response = requests.get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Get USD rate
         usd_rate = data.get('rates', {}).get('USD', None)
         if usd_rate:
-            _exchange_rate_cache[currency] = usd_rate
+            _exchange_rate_cache[currency] = {
+                "rate": usd_rate,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+            }
+            _save_exchange_rate_cache()
             return usd_rate
         else:
             logger.warning(f"Could not find USD rate for {currency}, assuming 1.0")
@@ -96,15 +235,23 @@ def convert_price_to_usd(price_value: float, currency: str) -> float:
     exchange_rate = get_exchange_rate_to_usd(currency)
     return price_value * exchange_rate
 
-def fetch_all_sold_listings(query: str) -> List[dict]:
+# Listing fields read when filtering and grouping; the rest of each item summary
+# (images, seller, shipping, ...) is dropped as pages arrive
+LISTING_FIELDS = ("title", "price", "categoryPath")
+
+def _trim_listing(item: dict) -> dict:
+    """Keep only the LISTING_FIELDS of an eBay item summary."""
+    return {field: item[field] for field in LISTING_FIELDS if field in item}
+
+def iter_all_sold_listings(query: str) -> Iterator[dict]:
     """
     Fetch all sold listings for a query with pagination.
-    Returns all items across all pages.
+    Yields items page by page, so a caller can process each page before the next is fetched.
     """
     ebay_access_token = os.environ.get("EBAY_ACCESS_TOKEN")
     if not ebay_access_token:
         logger.error("EBAY_ACCESS_TOKEN not found. Please ensure batch_update.py sets it.")
-        return []
+        return
     
     headers = {
         "Authorization": f"Bearer {ebay_access_token}",
@@ -113,7 +260,7 @@ def fetch_all_sold_listings(query: str) -> List[dict]:
     }
     
     logger.info(f"Fetching all SOLD listings for: {query}")
-    all_items = []
+    fetched_count = 0
     offset = 0
     limit = 200
     max_items = 10000
@@ -131,18 +278,19 @@ def fetch_all_sold_listings(query: str) -> List[dict]:
         if response is None:
             break
         
-        data = response.json()
+        data = orjson.loads(response.content)
         page_items = data.get("itemSummaries", [])
         
         if offset == 0:
             total_items = data.get("total", 0)
             logger.info(f"Total sold items available: {total_items}")
         
-        all_items.extend(page_items)
-        logger.info(f"Fetched page {offset // limit + 1}: {len(page_items)} items (total so far: {len(all_items)})")
+        yield from page_items
+        fetched_count += len(page_items)
+        logger.info(f"Fetched page {offset // limit + 1}: {len(page_items)} items (total so far: {fetched_count})")
         
         # Check if we've retrieved all available items
-        if len(all_items) >= total_items:
+        if fetched_count >= total_items:
             logger.info(f"Retrieved all {total_items} items reported by API")
             break
         
@@ -150,7 +298,7 @@ def fetch_all_sold_listings(query: str) -> List[dict]:
             if len(page_items) == 0:
                 logger.info(f"No more items available (got 0 items on this page)")
                 break
-            if len(all_items) < total_items * 0.1:
+            if fetched_count < total_items * 0.1:
                 logger.warning(f"Got {len(page_items)} items (less than limit {limit}) but API reports {total_items} total")
                 logger.warning(f"eBay Buy API has a maximum return limit (~500-1000 items) even if more exist")
                 logger.warning(f"Stopping pagination - API will not return more results")
@@ -158,21 +306,27 @@ def fetch_all_sold_listings(query: str) -> List[dict]:
         
         offset += limit
     
-    if len(all_items) < total_items:
-        logger.info(f"Fetched {len(all_items)} items but API reports {total_items} total")
+    if fetched_count < total_items:
+        logger.info(f"Fetched {fetched_count} items but API reports {total_items} total")
         logger.info(f"This is a known eBay Buy API limitation - it caps results at ~500-1000 items")
-    logger.info(f"Total sold items fetched: {len(all_items)}")
-    return all_items
+    logger.info(f"Total sold items fetched: {fetched_count}")
 
-def fetch_all_current_listings(query: str) -> List[dict]:
+def fetch_all_sold_listings(query: str) -> List[dict]:
+    """
+    Fetch all sold listings for a query with pagination.
+    Returns all items across all pages, keeping only LISTING_FIELDS of each item.
+    """
+    return [_trim_listing(item) for item in iter_all_sold_listings(query)]
+
+def iter_all_current_listings(query: str) -> Iterator[dict]:
     """
     Fetch all current listings for a query with pagination.
-    Returns all items across all pages.
+    Yields items page by page, so a caller can process each page before the next is fetched.
     """
     ebay_access_token = os.environ.get("EBAY_ACCESS_TOKEN")
     if not ebay_access_token:
         logger.error("EBAY_ACCESS_TOKEN not found. Please ensure batch_update.py sets it.")
-        return []
+        return
     
     headers = {
         "Authorization": f"Bearer {ebay_access_token}",
@@ -181,7 +335,7 @@ def fetch_all_current_listings(query: str) -> List[dict]:
     }
     
     logger.info(f"Fetching all CURRENT listings for: {query}")
-    all_items = []
+    fetched_count = 0
     offset = 0
     limit = 200
     max_items = 10000
@@ -197,18 +351,19 @@ def fetch_all_current_listings(query: str) -> List[dict]:
         if response is None:
             break
         
-        data = response.json()
+        data = orjson.loads(response.content)
         page_items = data.get("itemSummaries", [])
         
         if offset == 0:
             total_items = data.get("total", 0)
             logger.info(f"Total current items available: {total_items}")
         
-        all_items.extend(page_items)
-        logger.info(f"Fetched page {offset // limit + 1}: {len(page_items)} items (total so far: {len(all_items)})")
+        yield from page_items
+        fetched_count += len(page_items)
+        logger.info(f"Fetched page {offset // limit + 1}: {len(page_items)} items (total so far: {fetched_count})")
         
         # Check if we've retrieved all available items
-        if len(all_items) >= total_items:
+        if fetched_count >= total_items:
             logger.info(f"Retrieved all {total_items} items reported by API")
             break
         
@@ -216,7 +371,7 @@ def fetch_all_current_listings(query: str) -> List[dict]:
             if len(page_items) == 0:
                 logger.info(f"No more items available (got 0 items on this page)")
                 break
-            if len(all_items) < total_items * 0.1:
+            if fetched_count < total_items * 0.1:
                 logger.warning(f"Got {len(page_items)} items (less than limit {limit}) but API reports {total_items} total")
                 logger.warning(f"eBay Buy API has a maximum return limit (~500-1000 items) even if more exist")
                 logger.warning(f"Stopping pagination - API will not return more results")
@@ -224,11 +379,53 @@ def fetch_all_current_listings(query: str) -> List[dict]:
         
         offset += limit
     
-    if len(all_items) < total_items:
-        logger.info(f"Fetched {len(all_items)} items but API reports {total_items} total")
+    if fetched_count < total_items:
+        logger.info(f"Fetched {fetched_count} items but API reports {total_items} total")
         logger.info(f"This is a known eBay Buy API limitation - it caps results at ~500-1000 items")
-    logger.info(f"Total current items fetched: {len(all_items)}")
-    return all_items
+    logger.info(f"Total current items fetched: {fetched_count}")
+
+# Promo sets are excluded from pricing
+PROMO_SETS = (
+    "Dust Reward Promos",
+    "Arthurian Legends Promo",
+    "dustRewardPromo",
+    "arthurianLegendsPromo"
+)
+_NORMALIZED_PROMO_SETS = frozenset(normalize_to_american_english(ps).lower() for ps in PROMO_SETS)
+
+def fetch_all_current_listings(query: str) -> List[dict]:
+    """
+    Fetch all current listings for a query with pagination.
+    Returns all items across all pages, keeping only LISTING_FIELDS of each item.
+    """
+    return [_trim_listing(item) for item in iter_all_current_listings(query)]
+
+# Marks the end of a streamed listing fetch in its queue
+_END_OF_LISTINGS = object()
+
+def _stream_listings(executor: ThreadPoolExecutor, iter_listings: Callable[[str], Iterator[dict]], query: str) -> Iterator[dict]:
+    """
+    Start a listing fetch on the executor and return an iterator over its trimmed items.
+    Items are handed over as pages arrive, so the caller can filter them while this and
+    other fetches are still running; an error in the fetch is raised by the iterator.
+    """
+    items = queue.SimpleQueue()
+    
+    def fetch():
+        try:
+            for item in iter_listings(query):
+                items.put(_trim_listing(item))
+        finally:
+            items.put(_END_OF_LISTINGS)
+    
+    future = executor.submit(fetch)
+    
+    def stream():
+        while (item := items.get()) is not _END_OF_LISTINGS:
+            yield item
+        future.result()
+    
+    return stream()
 
 def is_promo_card(title: str, set_name: str) -> bool:
     """
@@ -243,85 +440,136 @@ def is_promo_card(title: str, set_name: str) -> bool:
         return True
     
     # Check if set name is a promo set
-    promo_sets = [
-        "Dust Reward Promos",
-        "Arthurian Legends Promo",
-        "dustRewardPromo",
-        "arthurianLegendsPromo"
-    ]
-    
-    normalized_set_name = normalize_to_american_english(set_name).lower()
-    for promo_set in promo_sets:
-        if normalize_to_american_english(promo_set).lower() == normalized_set_name:
-            return True
-    
-    return False
+    return normalize_to_american_english(set_name).lower() in _NORMALIZED_PROMO_SETS
 
-def extract_card_info_from_title(title: str, master_card_list: Dict) -> Optional[Tuple[str, str]]:
-    """
-    Try to extract card name and set name from an eBay listing title.
-    Returns (card_name, set_name) if found, None otherwise.
-    Uses word boundary matching for better accuracy.
-    Excludes promo sets and cards with "promo" in the title.
+# Runs of word characters, the same characters re's \b treats as word characters
+_WORD_RE = re.compile(r"\w+")
+
+@dataclass
+class CardTitleIndex:
     """
+    Master card list prepared once for matching many listing titles.
     
-    # Normalize title for matching
-    normalized_title = normalize_to_american_english(title).lower()
-    
-    # Skip if title contains "promo" - we want to exclude promo cards
-    if "promo" in normalized_title:
-        return None
+    A card name can only match a title at word boundaries if the name's first word is
+    also a whole word of the title, so cards are indexed by their first word and each
+    title only checks the cards whose first word it contains.
+    """
+    # (card_name, normalized_card_name, card_pattern, sets), longest name first, where
+    # sets is [(set_name, normalized_set_name, set_pattern)] without promo sets, longest first
+    cards: List[Tuple[str, str, re.Pattern, List[Tuple[str, str, re.Pattern]]]]
+    # First word of the normalized name -> positions in cards
+    by_first_word: Dict[str, List[int]]
+    # Positions of names that don't start with a word character (checked for every title)
+    unindexed: List[int]
+
+def build_card_title_index(master_card_list: Dict) -> CardTitleIndex:
+    """
+    Build the card name index used by extract_card_info_from_title.
     
-    # Try to match against master card list
+    Args:
+        master_card_list: Master card list (card name -> card info with "sets")
+        
+    Returns:
+        CardTitleIndex for the master card list
+    """
+    cards = []
+    by_first_word = {}
+    unindexed = []
     # Sort by card name length (longer names first) to avoid partial matches
-    cards_sorted = sorted(master_card_list.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    # Define promo sets to exclude
-    promo_sets = [
-        "Dust Reward Promos",
-        "Arthurian Legends Promo",
-        "dustRewardPromo",
-        "arthurianLegendsPromo"
-    ]
-    normalized_promo_sets = {normalize_to_american_english(ps).lower() for ps in promo_sets}
-    
-    for card_name, card_info in cards_sorted:
+    for card_name, card_info in sorted(master_card_list.items(), key=lambda x: len(x[0]), reverse=True):
         normalized_card_name = normalize_to_american_english(card_name).lower()
+        # Word boundary pattern for the card name (special regex characters escaped)
+        card_pattern = re.compile(r'\b' + re.escape(normalized_card_name) + r'\b')
         
-        # Create word boundary pattern for card name
-        # Escape special regex characters
-        card_pattern = r'\b' + re.escape(normalized_card_name) + r'\b'
-        
-        # Check if card name appears in title with word boundaries
-        if not re.search(card_pattern, normalized_title):
-            continue
-        
-        # Check each set for this card
         # Sort sets by name length (longer first) for better matching
-        sets_sorted = sorted(card_info.get("sets", []), key=lambda x: len(x.get("set_name", "")), reverse=True)
-        
-        for set_info in sets_sorted:
+        sets = []
+        for set_info in sorted(card_info.get("sets", []), key=lambda x: len(x.get("set_name", "")), reverse=True):
             set_name = set_info.get("set_name", "")
             if not set_name:
                 continue
             
             # Skip promo sets
             normalized_set_name = normalize_to_american_english(set_name).lower()
-            if normalized_set_name in normalized_promo_sets:
+            if normalized_set_name in _NORMALIZED_PROMO_SETS:
                 continue
             
-            # Create word boundary pattern for set name
-            set_pattern = r'\b' + re.escape(normalized_set_name) + r'\b'
-            
-            # Check if set name appears in title with word boundaries
-            if re.search(set_pattern, normalized_title):
+            set_pattern = re.compile(r'\b' + re.escape(normalized_set_name) + r'\b')
+            sets.append((set_name, normalized_set_name, set_pattern))
+        
+        # A card without any non-promo set can never be matched
+        if not sets:
+            continue
+        
+        position = len(cards)
+        cards.append((card_name, normalized_card_name, card_pattern, sets))
+        first_word = _WORD_RE.match(normalized_card_name)
+        if first_word:
+            by_first_word.setdefault(first_word.group(), []).append(position)
+        else:
+            unindexed.append(position)
+    
+    return CardTitleIndex(cards=cards, by_first_word=by_first_word, unindexed=unindexed)
+
+def extract_card_info_from_normalized_title(normalized_title: str, card_index: CardTitleIndex) -> Optional[Tuple[str, str]]:
+    """
+    Match an already normalized (and lowercased) listing title against a card index.
+    Returns (card_name, set_name) if found, None otherwise.
+    
+    Args:
+        normalized_title: Title passed through normalize_to_american_english and lowercased
+        card_index: Index from build_card_title_index
+        
+    Returns:
+        (card_name, set_name) of the longest matching card name, or None
+    """
+    # Skip if title contains "promo" - we want to exclude promo cards
+    if "promo" in normalized_title:
+        return None
+    
+    # Only cards whose first word is a word of the title can match; checking them in
+    # index order keeps the longest-name-first preference
+    candidates = set(card_index.unindexed)
+    for word in set(_WORD_RE.findall(normalized_title)):
+        positions = card_index.by_first_word.get(word)
+        if positions:
+            candidates.update(positions)
+    
+    for position in sorted(candidates):
+        card_name, normalized_card_name, card_pattern, sets = card_index.cards[position]
+        
+        # Plain substring check first; only titles that contain the name need the regex
+        if normalized_card_name not in normalized_title:
+            continue
+        
+        # Check if card name appears in title with word boundaries
+        if not card_pattern.search(normalized_title):
+            continue
+        
+        # Check each set for this card
+        for set_name, normalized_set_name, set_pattern in sets:
+            if normalized_set_name in normalized_title and set_pattern.search(normalized_title):
                 return (card_name, set_name)
     
     return None
 
-def filter_and_group_listings(sold_items: List[dict], current_items: List[dict], master_card_list: Dict) -> Dict:
+def extract_card_info_from_title(title: str, master_card_list: Dict, card_index: CardTitleIndex = None) -> Optional[Tuple[str, str]]:
+    """
+    Try to extract card name and set name from an eBay listing title.
+    Returns (card_name, set_name) if found, None otherwise.
+    Uses word boundary matching for better accuracy.
+    Excludes promo sets and cards with "promo" in the title.
+    Pass card_index (from build_card_title_index) when matching many titles.
+    """
+    if card_index is None:
+        card_index = build_card_title_index(master_card_list)
+    
+    # Normalize title for matching
+    return extract_card_info_from_normalized_title(normalize_to_american_english(title).lower(), card_index)
+
+def filter_and_group_listings(sold_items: Iterable[dict], current_items: Iterable[dict], master_card_list: Dict) -> Dict:
     """
     Filter listings and group by card name, set, and foil/non-foil.
+    The listings can be iterators; each item is matched and bucketed as it is read.
     Returns: {
         (card_name, set_name, is_foil): {
             'sold_prices': [...],
@@ -329,10 +577,15 @@ def filter_and_group_listings(sold_items: List[dict], current_items: List[dict],
             'completed_prices': [...]  # Same as sold for now
         }
     }
+    Each price list is an array('d') of USD prices.
     """
-    all_items = sold_items + current_items
-    total_items = len(all_items)
-    logger.info(f"Filtering and grouping {total_items} listings ({len(sold_items)} sold, {len(current_items)} current)...")
+    logger.info("Filtering and grouping listings as they are fetched...")
+    
+    # Card names are indexed once instead of being re-sorted and re-normalized for every title
+    card_index = build_card_title_index(master_card_list)
+    # Match result per normalized title; the same title often appears in both sold and
+    # current listings and across pages, so each distinct title is matched once
+    match_cache: Dict[str, Optional[Tuple[str, str]]] = {}
     
     grouped = {}
     excluded_graded = 0
@@ -341,80 +594,26 @@ def filter_and_group_listings(sold_items: List[dict], current_items: List[dict],
     unmatched = 0
     matched = 0
     processed_count = 0
-    
-    # Progress update interval (update every N items)
-    PROGRESS_INTERVAL = max(100, total_items // 20)  # Update at least 20 times, or every 100 items
-    
-    # Process sold items
-    logger.info(f"Processing {len(sold_items)} sold items...")
-    for idx, item in enumerate(sold_items):
-        processed_count += 1
-        
-        # Show progress periodically
-        if processed_count % PROGRESS_INTERVAL == 0 or processed_count == total_items:
-            percentage = (processed_count / total_items) * 100
-            logger.info(f"Progress: {processed_count:,}/{total_items:,} ({percentage:.1f}%) - Matched: {matched:,}, Excluded: {excluded_graded + excluded_keywords + excluded_promo:,}, Unmatched: {unmatched:,}")
-        # Filter out graded cards
-        if is_graded_card(item):
-            excluded_graded += 1
-            continue
-        
-        # Filter out bulk/lot listings
-        if should_exclude_item(item):
-            excluded_keywords += 1
-            continue
-        
-        # Try to extract card info from title
-        title = item.get("title", "")
-        card_info = extract_card_info_from_title(title, master_card_list)
-        
-        if card_info is None:
-            unmatched += 1
-            continue
-        
-        card_name, set_name = card_info
-        
-        # Double-check for promo cards (in case they slipped through)
-        if is_promo_card(title, set_name):
-            excluded_promo += 1
-            continue
-        
-        is_foil = is_foil_item(item)
-        
-        # Get price and currency
-        price_info = item.get("price", {})
-        price_value = price_info.get("value", "0.0")
-        currency = price_info.get("currency", "USD")
-        
-        try:
-            price = float(price_value)
-            # Convert to USD if needed
-            price_usd = convert_price_to_usd(price, currency)
-        except (ValueError, TypeError):
-            continue
-        
-        # Group by (card_name, set_name, is_foil)
-        key = (card_name, set_name, is_foil)
-        if key not in grouped:
-            grouped[key] = {
-                'sold_prices': [],
-                'current_prices': [],
-                'completed_prices': []
-            }
-        
-        grouped[key]['sold_prices'].append(price_usd)
-        grouped[key]['completed_prices'].append(price_usd)
-        matched += 1
-    
-    # Process current items
-    logger.info(f"Processing {len(current_items)} current items...")
-    for idx, item in enumerate(current_items):
+    sold_count = 0
+    
+    # Progress update interval (update every N items; the total isn't known while streaming)
+    PROGRESS_INTERVAL = 1000
+    
+    # Sold and current listings go through the same filtering; only the price lists they
+    # are added to differ (sold prices also count as completed prices for now)
+    sold_buckets = ('sold_prices', 'completed_prices')
+    current_buckets = ('current_prices',)
+    for item, buckets in chain(
+        ((item, sold_buckets) for item in sold_items),
+        ((item, current_buckets) for item in current_items)
+    ):
         processed_count += 1
+        if buckets is sold_buckets:
+            sold_count += 1
         
         # Show progress periodically
-        if processed_count % PROGRESS_INTERVAL == 0 or processed_count == total_items:
-            percentage = (processed_count / total_items) * 100
-            logger.info(f"Progress: {processed_count:,}/{total_items:,} ({percentage:.1f}%) - Matched: {matched:,}, Excluded: {excluded_graded + excluded_keywords + excluded_promo:,}, Unmatched: {unmatched:,}")
+        if processed_count % PROGRESS_INTERVAL == 0:
+            logger.info(f"Progress: {processed_count:,} listings - Matched: {matched:,}, Excluded: {excluded_graded + excluded_keywords + excluded_promo:,}, Unmatched: {unmatched:,}")
         # Filter out graded cards
         if is_graded_card(item):
             excluded_graded += 1
@@ -427,7 +626,11 @@ def filter_and_group_listings(sold_items: List[dict], current_items: List[dict],
         
         # Try to extract card info from title
         title = item.get("title", "")
-        card_info = extract_card_info_from_title(title, master_card_list)
+        normalized_title = normalize_to_american_english(title).lower()
+        if normalized_title in match_cache:
+            card_info = match_cache[normalized_title]
+        else:
+            card_info = match_cache[normalized_title] = extract_card_info_from_normalized_title(normalized_title, card_index)
         
         if card_info is None:
             unmatched += 1
@@ -457,17 +660,21 @@ def filter_and_group_listings(sold_items: List[dict], current_items: List[dict],
         # Group by (card_name, set_name, is_foil)
         key = (card_name, set_name, is_foil)
         if key not in grouped:
+            # Prices are stored as contiguous doubles rather than lists of float objects
             grouped[key] = {
-                'sold_prices': [],
-                'current_prices': [],
-                'completed_prices': []
+                'sold_prices': array('d'),
+                'current_prices': array('d'),
+                'completed_prices': array('d')
             }
         
-        grouped[key]['current_prices'].append(price_usd)
+        group = grouped[key]
+        for bucket in buckets:
+            group[bucket].append(price_usd)
         matched += 1
     
-    # Final progress update
-    logger.info(f"Progress: {processed_count:,}/{total_items:,} (100.0%) - Complete!")
+    logger.info(f"Total sold items: {sold_count:,}")
+    logger.info(f"Total current items: {processed_count - sold_count:,}")
+    logger.info(f"Grand total: {processed_count:,} items")
     logger.info(f"Filtering Summary:")
     logger.info(f"  Excluded {excluded_graded:,} graded cards")
     logger.info(f"  Excluded {excluded_keywords:,} bulk/lot listings")
@@ -488,18 +695,9 @@ def calculate_medians(grouped_data: Dict) -> Dict:
     
     medians = {}
     
-    def get_median(prices: List[float]) -> float:
-        """Calculate median of a list of prices."""
-        if not prices:
-            return 0.0
-        sorted_prices = sorted(prices)
-        n = len(sorted_prices)
-        if n % 2 == 0:
-            # Even number of items - average the two middle values
-            return (sorted_prices[n // 2 - 1] + sorted_prices[n // 2]) / 2.0
-        else:
-            # Odd number of items - return the middle value
-            return sorted_prices[n // 2]
+    def get_median(prices: Sequence[float]) -> float:
+        """Calculate median of a list of prices (the two middle values averaged for even counts)."""
+        return median(prices) if prices else 0.0
     
     for (card_name, set_name, is_foil), prices in grouped_data.items():
         sold_prices = prices['sold_prices']
@@ -508,7 +706,8 @@ def calculate_medians(grouped_data: Dict) -> Dict:
         
         median_sold = get_median(sold_prices)
         median_current = get_median(current_prices)
-        median_completed = get_median(completed_prices)
+        # Completed prices are currently the sold prices, so their median is usually already known
+        median_completed = median_sold if completed_prices == sold_prices else get_median(completed_prices)
         
         # Market price: median of sold and current medians (same as original logic but with medians)
         market_price = (median_sold + median_current) / 2 if (median_sold > 0 and median_current > 0) else (median_sold if median_sold > 0 else median_current)
@@ -571,72 +770,55 @@ def _generate_card_data_from_medians(medians: Dict, master_card_list: Dict, outp
         rarity = set_info.get("rarity", "Ordinary")
         slug = set_info.get("slug", "")
         
-        # Create card entry
-        condition = "NMF" if is_foil else "NM"
-        card_entry = {
-            "name": card_name,
-            "price": f"{median_data['marketPrice']:.2f}",
-            "avgSoldPrice": f"{median_data['avgSoldPrice']:.2f}",
-            "avgCurrentPrice": f"{median_data['avgCurrentPrice']:.2f}",
-            "condition": condition,
-            "rarity": rarity,
-            "slug": slug,
-            "set_name": set_name,
-        }
-        
-        # Add to appropriate lists
-        if is_foil:
-            all_sets_processed_data[set_name]["foil"].append(card_entry)
-            all_sets_processed_data[set_name]["foilByName"].append(card_entry)
-            if rarity in all_sets_processed_data[set_name]["foilByRarityPrice"]:
-                all_sets_processed_data[set_name]["foilByRarityPrice"][rarity].append(card_entry)
-            if rarity in all_sets_processed_data[set_name]["foilByRarityName"]:
-                all_sets_processed_data[set_name]["foilByRarityName"][rarity].append(card_entry)
-        else:
-            all_sets_processed_data[set_name]["nonFoil"].append(card_entry)
-            all_sets_processed_data[set_name]["nonFoilByName"].append(card_entry)
-            if rarity in all_sets_processed_data[set_name]["nonFoilByRarityPrice"]:
-                all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity].append(card_entry)
-            if rarity in all_sets_processed_data[set_name]["nonFoilByRarityName"]:
-                all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity].append(card_entry)
-    
-    # Sort all arrays
-    for set_name in all_sets_processed_data:
-        # Sort by price descending
-        all_sets_processed_data[set_name]["nonFoil"].sort(
-            key=lambda x: float(x["price"].replace(',', '')), reverse=True
-        )
-        all_sets_processed_data[set_name]["foil"].sort(
-            key=lambda x: float(x["price"].replace(',', '')), reverse=True
+        # Create card entry (prices rounded to cents so sorting matches the written values;
+        # they're formatted as strings once, after sorting)
+        condition = CONDITION_FOIL if is_foil else CONDITION_NONFOIL
+        card_entry = EbayCardEntry(
+            name=card_name,
+            price=round(median_data['marketPrice'], 2),
+            avgSoldPrice=round(median_data['avgSoldPrice'], 2),
+            avgCurrentPrice=round(median_data['avgCurrentPrice'], 2),
+            condition=condition,
+            rarity=rarity,
+            slug=slug,
+            set_name=set_name,
         )
         
-        # Sort by name
-        all_sets_processed_data[set_name]["nonFoilByName"].sort(key=lambda x: x["name"])
-        all_sets_processed_data[set_name]["foilByName"].sort(key=lambda x: x["name"])
-        
-        # Sort by rarity/price
-        for rarity in RARITIES:
-            if rarity in all_sets_processed_data[set_name]["nonFoilByRarityPrice"]:
-                all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity].sort(
-                    key=lambda x: float(x["price"].replace(',', '')), reverse=True
-                )
-            if rarity in all_sets_processed_data[set_name]["foilByRarityPrice"]:
-                all_sets_processed_data[set_name]["foilByRarityPrice"][rarity].sort(
-                    key=lambda x: float(x["price"].replace(',', '')), reverse=True
-                )
+        # Add to the set's foil or non-foil list; the sorted and per-rarity lists are built from it below
+        all_sets_processed_data[set_name]["foil" if is_foil else "nonFoil"].append(card_entry)
+    
+    # Sort each foil/non-foil list once by name and once by price, then split the sorted
+    # lists by rarity (filtering a stably sorted list keeps the order sorting each rarity
+    # list on its own would give, so no per-rarity sorts are needed)
+    for set_data in all_sets_processed_data.values():
+        for prefix in ("nonFoil", "foil"):
+            entries = set_data[prefix]
             
-            if rarity in all_sets_processed_data[set_name]["nonFoilByRarityName"]:
-                all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity].sort(
-                    key=lambda x: x["name"]
-                )
-            if rarity in all_sets_processed_data[set_name]["foilByRarityName"]:
-                all_sets_processed_data[set_name]["foilByRarityName"][rarity].sort(
-                    key=lambda x: x["name"]
-                )
-    
-    # Save to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_sets_processed_data, f, ensure_ascii=False, indent=4)
+            # Sort by name (before the price sort, so both start from insertion order)
+            by_name = sorted(entries, key=_name_sort_key)
+            set_data[f"{prefix}ByName"] = by_name
+            
+            # Sort by price descending
+            entries.sort(key=_price_sort_key, reverse=True)
+            
+            # Split by rarity
+            by_rarity_price = set_data[f"{prefix}ByRarityPrice"]
+            for card_entry in entries:
+                rarity_entries = by_rarity_price.get(card_entry.rarity)
+                if rarity_entries is not None:
+                    rarity_entries.append(card_entry)
+            by_rarity_name = set_data[f"{prefix}ByRarityName"]
+            for card_entry in by_name:
+                rarity_entries = by_rarity_name.get(card_entry.rarity)
+                if rarity_entries is not None:
+                    rarity_entries.append(card_entry)
+    
+    # Save to file (orjson writes UTF-8 directly; 2-space indent keeps the file diffable).
+    # Entries go through to_json() rather than orjson's own dataclass output, which would
+    # write the prices as numbers
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(all_sets_processed_data, default=_card_entry_to_json,
+                             option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS))
     
     logger.info(f"Saved {output_file}")
     logger.info(f"Total sets: {len(all_sets_processed_data)}")
@@ -647,71 +829,6 @@ def _generate_card_data_from_medians(medians: Dict, master_card_list: Dict, outp
     logger.info(f"Total non-foil cards: {total_nonfoil}")
     logger.info(f"Total foil cards: {total_foil}")
 
-def get_or_refresh_access_token():
-    """
-    Get or refresh eBay access token.
-    Checks for cached token first, then gets a new one if needed.
-    """
-    TOKEN_FILE = "ebay_token.json"
-    
-    # Check if token file exists and is still valid
-    if os.path.exists(TOKEN_FILE):
-        try:
-            with open(TOKEN_FILE, 'r') as f:
-                token_info = json.load(f)
-            expires_at_value = token_info.get("expires_at", "")
-            if expires_at_value:
-                # Handle both string ISO format and numeric timestamp
-                if isinstance(expires_at_value, str):
-                    # Parse ISO format, handling 'Z' as UTC
-                    if expires_at_value.endswith('Z'):
-                        expires_at = datetime.fromisoformat(expires_at_value.replace('Z', '+00:00'))
-                    else:
-                        expires_at = datetime.fromisoformat(expires_at_value)
-                else:
-                    # Assume it's a timestamp
-                    expires_at = datetime.fromtimestamp(expires_at_value, tz=timezone.utc)
-                
-                # Ensure both times are timezone-aware for proper comparison
-                if expires_at.tzinfo is None:
-                    expires_at = expires_at.replace(tzinfo=timezone.utc)
-                
-                now = datetime.now(timezone.utc)
-                time_until_expiry = (expires_at - now).total_seconds()
-                
-                # Check if token expires more than 5 minutes from now
-                if expires_at > now + timedelta(minutes=5):
-                    minutes_remaining = time_until_expiry / 60
-                    logger.info(f"Using existing eBay access token (expires in {minutes_remaining:.1f} minutes).")
-                    return token_info["access_token"]
-                else:
-                    if time_until_expiry > 0:
-                        logger.info(f"Token expires soon (in {time_until_expiry/60:.1f} minutes), refreshing...")
-                    else:
-                        logger.info(f"Token has expired ({abs(time_until_expiry)/60:.1f} minutes ago), refreshing...")
-        except (KeyError, ValueError, TypeError) as e:
-            logger.warning(f"Error reading token file, will refresh: {e}")
-    
-    # If token doesn't exist or is expired/about to expire, get a new one
-    logger.info("Refreshing eBay access token...")
-    new_token_info = get_application_access_token()
-    if new_token_info:
-        # Store new token with expiry time (subtract 1 minute as safety margin for refresh)
-        now_utc = datetime.now(timezone.utc)
-        expires_at = now_utc + timedelta(seconds=new_token_info["expires_in"]) - timedelta(minutes=1)
-        new_token_info["expires_at"] = expires_at.isoformat()
-        with open(TOKEN_FILE, 'w') as f:
-            json.dump(new_token_info, f, indent=4)
-        # Set secure permissions after writing (Unix/Linux only, safe to ignore on Windows)
-        try:
-            os.chmod(TOKEN_FILE, 0o600)
-        except (OSError, NotImplementedError):
-            # Windows doesn't support Unix-style permissions, which is fine for local dev
-            pass
-        logger.info("New eBay access token obtained and saved.")
-        return new_token_info["access_token"]
-    return None
-
 def generate_card_data_json(output_file_path: str, test_mode: bool = False, test_card_name: str = None, test_set_name: str = None):
     """
     Generate card data JSON from eBay API using bulk fetch approach.
@@ -759,39 +876,24 @@ def generate_card_data_json(output_file_path: str, test_mode: bool = False, test
     
     logger.info(f"Found {len(all_sets)} sets: {', '.join(sorted(all_sets))}")
     
-    # Fetch all listings by set
+    # Fetch, filter and group all listings by set
     logger.info("=" * 80)
-    logger.info("FETCHING ALL LISTINGS BY SET")
+    logger.info("FETCHING, FILTERING AND GROUPING ALL LISTINGS BY SET")
     logger.info("=" * 80)
     
-    all_sold_items = []
-    all_current_items = []
-    
-    for set_name in sorted(all_sets):
-        logger.info(f"--- Processing {set_name} ---")
-        query = f"Sorcery Contested Realm {set_name}"
-        
-        sold_items = fetch_all_sold_listings(query)
-        current_items = fetch_all_current_listings(query)
-        
-        all_sold_items.extend(sold_items)
-        all_current_items.extend(current_items)
-        
-        logger.info(f"{set_name}: {len(sold_items)} sold + {len(current_items)} current = {len(sold_items) + len(current_items)} items")
-    
-    logger.info("=" * 80)
-    logger.info("TOTAL ITEMS FETCHED")
-    logger.info("=" * 80)
-    logger.info(f"Total sold items: {len(all_sold_items)}")
-    logger.info(f"Total current items: {len(all_current_items)}")
-    logger.info(f"Grand total: {len(all_sold_items) + len(all_current_items)} items")
-    
-    # Filter and group
-    logger.info("=" * 80)
-    logger.info("FILTERING AND GROUPING")
-    logger.info("=" * 80)
-    
-    grouped_data = filter_and_group_listings(all_sold_items, all_current_items, master_card_list)
+    # Sold and current listings are independent queries, so every (set, kind) pair is its own
+    # fetch task. Items are filtered as they arrive, in set order (all sold, then all current),
+    # so the grouped output doesn't depend on which fetch finished first. Items are only
+    # buffered until the filter reaches their set, instead of all being collected first
+    sorted_sets = sorted(all_sets)
+    queries = [f"Sorcery Contested Realm {set_name}" for set_name in sorted_sets]
+    with ThreadPoolExecutor(max_workers=max(1, min(LISTING_FETCH_MAX_WORKERS, 2 * len(queries)))) as executor:
+        # Submitted in the order they are read, so the stream being filtered is always running
+        sold_streams = [_stream_listings(executor, iter_all_sold_listings, query) for query in queries]
+        current_streams = [_stream_listings(executor, iter_all_current_listings, query) for query in queries]
+        grouped_data = filter_and_group_listings(
+            chain.from_iterable(sold_streams), chain.from_iterable(current_streams), master_card_list
+        )
     
     # Calculate medians
     logger.info("=" * 80)
@@ -1,11 +1,14 @@
 import json
+import orjson
 import os
 import re
 import requests
+import threading
 import time
 import unicodedata
-from datetime import datetime, timedelta
+from operator import itemgetter
 from config import EBAY_BUY_API_ENDPOINT
+from ebay_auth import SESSION, REQUEST_TIMEOUT
 
 # --- eBay API Configuration ---
 # EBAY_ACCESS_TOKEN is now read from environment variable set by batch_update.py for Buy API calls
@@ -14,13 +17,18 @@ from config import EBAY_BUY_API_ENDPOINT
 
 RARITIES = ["Ordinary", "Exceptional", "Elite", "Unique"]
 
+# Card conditions written to card data
+CONDITION_NONFOIL = "NM"
+CONDITION_FOIL = "NMF"
+
 # Rate limiting configuration
 API_CALL_DELAY = 0.7  # Delay in seconds between API calls
 MAX_RETRY_DELAY = 60  # Maximum delay for exponential backoff (60 seconds)
 INITIAL_RETRY_DELAY = 1  # Initial delay for exponential backoff (1 second)
 
-# Track last API call time for rate limiting
+# Track last API call time for rate limiting (the lock keeps the spacing when called from several threads)
 _last_api_call_time = 0
+_rate_limit_lock = threading.Lock()
 
 # Keywords to exclude from listings
 EXCLUSION_KEYWORDS = [
@@ -108,14 +116,15 @@ def normalize_to_american_english(text: str) -> str:
 def _wait_for_rate_limit():
     """Wait to maintain rate limit between API calls."""
     global _last_api_call_time
-    current_time = time.time()
-    time_since_last_call = current_time - _last_api_call_time
-    
-    if time_since_last_call < API_CALL_DELAY:
-        sleep_time = API_CALL_DELAY - time_since_last_call
-        time.sleep(sleep_time)
-    
-    _last_api_call_time = time.time()
+    with _rate_limit_lock:
+        current_time = time.time()
+        time_since_last_call = current_time - _last_api_call_time
+        
+        if time_since_last_call < API_CALL_DELAY:
+            sleep_time = API_CALL_DELAY - time_since_last_call
+            time.sleep(sleep_time)
+        
+        _last_api_call_time = time.time()
 
 def _make_rate_limited_request(url, headers, params, max_retries=5):
     """
@@ -137,7 +146,8 @@ def _make_rate_limited_request(url, headers, params, max_retries=5):
     
     while retry_count <= max_retries:
         try:
-            response = requests.get(url, headers=headers, params=params)
+            # ebay_auth's shared session reuses keep-alive connections (429s are handled below)
+            response = SESSION.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             
             # Check for rate limit error (429)
             if response.status_code == 429:
@@ -348,7 +358,7 @@ def fetch_sold_ebay_card_data(query: str) -> list:
             if response is None:
                 break
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # The Buy API returns items directly under 'itemSummaries'
             page_items = data.get("itemSummaries", [])
@@ -459,7 +469,7 @@ def fetch_current_ebay_card_data(query: str) -> list:
         if response is None:
             return []
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # The Buy API returns items directly under 'itemSummaries'
         items = data.get("itemSummaries", [])
@@ -505,12 +515,12 @@ def fetch_current_ebay_card_data(query: str) -> list:
 
 def load_master_card_list(file_path="card-data/sorcery_card_list.json"):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
     except FileNotFoundError:
         print(f"Error: Master card list not found at {file_path}")
         return None
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"Error decoding master card list: {e}")
         return None
 
@@ -610,6 +620,32 @@ def _is_card_complete(existing_data: dict, card_name: str, set_name: str) -> boo
     
     return nonfoil_found and foil_found
 
+def _price_sort_key(card: dict) -> float:
+    """Sort key for a card's market price."""
+    return float(card["price"].replace(',', ''))
+
+# Sort key for a card's name
+_name_sort_key = itemgetter("name")
+
+def sort_by_price(cards):
+    """Sort cards by market price (highest first)."""
+    return sorted(cards, key=_price_sort_key, reverse=True)
+
+def sort_by_name(cards):
+    """Sort cards by name."""
+    return sorted(cards, key=_name_sort_key)
+
+def sort_by_name_and_price(cards):
+    """
+    Sort cards by name, then derive the price order from the name-sorted list.
+    Cards with equal prices stay in name order.
+    
+    Returns:
+        Tuple of (cards sorted by name, cards sorted by price highest first)
+    """
+    by_name = sort_by_name(cards)
+    return by_name, sort_by_price(by_name)
+
 def generate_card_data_json(output_file_path: str, test_mode: bool = True, test_card_name: str = "Philosopher's Stone", test_set_name: str = "Alpha"):
     """
     Generate card data JSON from eBay API.
@@ -819,16 +855,13 @@ def generate_card_data_json(output_file_path: str, test_mode: bool = True, test_
             print(f"  Final market price (non-foil): ${market_price_nonfoil:.2f}")
             print(f"  Final market price (foil): ${market_price_foil:.2f}")
 
-            condition_nonfoil = "NM"
-            condition_foil = "NMF"
-
             # Create non-foil card info
             card_info_nonfoil = {
                 "name": card_name,
                 "price": f"{market_price_nonfoil:.2f}",  # Market price: average of sold and current averages
                 "avgSoldPrice": f"{avg_sold_price_nonfoil:.2f}",
                 "avgCurrentPrice": f"{avg_current_price_nonfoil:.2f}",
-                "condition": condition_nonfoil,
+                "condition": CONDITION_NONFOIL,
                 "rarity": rarity_from_master,
                 "slug": slug,
                 "set_name": set_name,
@@ -840,7 +873,7 @@ def generate_card_data_json(output_file_path: str, test_mode: bool = True, test_
                 "price": f"{market_price_foil:.2f}",  # Market price: average of sold and current averages
                 "avgSoldPrice": f"{avg_sold_price_foil:.2f}",
                 "avgCurrentPrice": f"{avg_current_price_foil:.2f}",
-                "condition": condition_foil,
+                "condition": CONDITION_FOIL,
                 "rarity": rarity_from_master,
                 "slug": slug,
                 "set_name": set_name,
@@ -860,32 +893,22 @@ def generate_card_data_json(output_file_path: str, test_mode: bool = True, test_
             if rarity_from_master in all_sets_processed_data[set_name]["foilByRarityName"]:
                 all_sets_processed_data[set_name]["foilByRarityName"][rarity_from_master].append(card_info_foil)
 
-            # Periodic save every SAVE_INTERVAL cards
+            # Periodic save every SAVE_INTERVAL cards (skipped for the last card, the final save follows)
             processed_count += 1
-            if processed_count % SAVE_INTERVAL == 0:
+            if processed_count % SAVE_INTERVAL == 0 and processed_count < total_combinations:
                 _save_card_data_intermediate(all_sets_processed_data, output_file_path)
                 print(f"  Progress: {processed_count}/{total_combinations} cards processed (saved)")
 
     # Final sorting after all data is gathered for each set
+    # (each list is sorted by name once and its price order derived from that)
     for set_name in all_sets_processed_data:
-        def sort_by_price(cards):
-            return sorted(cards, key=lambda x: float(x["price"].replace(',', '')), reverse=True)
-
-        def sort_by_name(cards):
-            return sorted(cards, key=lambda x: x["name"])
-
-        all_sets_processed_data[set_name]["nonFoil"] = sort_by_price(all_sets_processed_data[set_name]["nonFoil"])
-        all_sets_processed_data[set_name]["nonFoilByName"] = sort_by_name(all_sets_processed_data[set_name]["nonFoil"])
-        
-        all_sets_processed_data[set_name]["foil"] = sort_by_price(all_sets_processed_data[set_name]["foil"])
-        all_sets_processed_data[set_name]["foilByName"] = sort_by_name(all_sets_processed_data[set_name]["foil"])
+        set_data = all_sets_processed_data[set_name]
+        set_data["nonFoilByName"], set_data["nonFoil"] = sort_by_name_and_price(set_data["nonFoil"])
+        set_data["foilByName"], set_data["foil"] = sort_by_name_and_price(set_data["foil"])
 
         for rarity_key in RARITIES:
-            all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity_key] = sort_by_price(all_sets_processed_data[set_name]["nonFoilByRarityPrice"][rarity_key])
-            all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity_key] = sort_by_name(all_sets_processed_data[set_name]["nonFoilByRarityName"][rarity_key])
-
-            all_sets_processed_data[set_name]["foilByRarityPrice"][rarity_key] = sort_by_price(all_sets_processed_data[set_name]["foilByRarityPrice"][rarity_key])
-            all_sets_processed_data[set_name]["foilByRarityName"][rarity_key] = sort_by_name(all_sets_processed_data[set_name]["foilByRarityName"][rarity_key])
+            set_data["nonFoilByRarityName"][rarity_key], set_data["nonFoilByRarityPrice"][rarity_key] = sort_by_name_and_price(set_data["nonFoilByRarityPrice"][rarity_key])
+            set_data["foilByRarityName"][rarity_key], set_data["foilByRarityPrice"][rarity_key] = sort_by_name_and_price(set_data["foilByRarityPrice"][rarity_key])
 
     # Final save with sorted data
     _save_card_data_intermediate(all_sets_processed_data, output_file_path)
@@ -900,7 +923,10 @@ def _save_card_data_intermediate(data: dict, output_file_path: str):
         output_file_path: Path to output JSON file
     """
     try:
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # orjson serializes in C straight to UTF-8 bytes, so the periodic saves of the
+        # growing dict stay cheap
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        with open(output_file_path, 'wb') as f:
+            f.write(payload)
     except Exception as e:
         print(f"Error saving card data: {e}")
@@ -1,13 +1,15 @@
-import json
+import orjson
 import requests
+from ebay_auth import SESSION, REQUEST_TIMEOUT
 
 def fetch_sorcery_cards():
     url = "https://api.sorcerytcg.com/api/cards"
     try:
-        response = requests.get(url)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        # Parse the raw bytes with orjson (the full card catalog is a large payload)
+        return orjson.loads(response.content)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error fetching Sorcery TCG cards: {e}")
         return None
 
@@ -73,8 +75,9 @@ def generate_master_card_list(output_file_path="card-data/sorcery_card_list.json
                 "slug": slug,
             })
             
-    with open(output_file_path, 'w', encoding='utf-8') as f:
-        json.dump(master_card_list, f, ensure_ascii=False, indent=4)
+    # orjson writes UTF-8 directly (card names keep their accents, as with ensure_ascii=False)
+    with open(output_file_path, 'wb') as f:
+        f.write(orjson.dumps(master_card_list, option=orjson.OPT_INDENT_2))
 
 if __name__ == "__main__":
     generate_master_card_list()